@@ -0,0 +1,89 @@
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from datetime import datetime
+from pymongo.errors import PyMongoError
+from .db import get_db
+
+logger = logging.getLogger(__name__)
+
+class TwoTierCache:
+    """Cache de respostas da IA: LRU em memória na frente de uma coleção do MongoDB.
+
+    A coleção tem índice TTL em `created_at` (ver app.core.indexes), então o
+    Mongo remove as respostas antigas sozinho. Requisições simultâneas para a
+    mesma chave compartilham uma única chamada a `compute`.
+    """
+
+    def __init__(self, collection: str, maxsize: int, ttl_seconds: int):
+        self.collection = collection
+        self.maxsize = maxsize
+        self.ttl_seconds = ttl_seconds
+        self.stats = {"memory_hits": 0, "db_hits": 0, "misses": 0, "coalesced": 0}
+        self._memory: OrderedDict[str, tuple[float, object]] = OrderedDict()
+        self._inflight: dict[str, asyncio.Future] = {}
+
+    def _memory_get(self, key: str):
+        item = self._memory.get(key)
+        if item is None:
+            return None
+        expires_at, value = item
+        if expires_at <= time.monotonic():
+            del self._memory[key]
+            return None
+        self._memory.move_to_end(key)
+        return value
+
+    def _memory_put(self, key: str, value, ttl: float | None = None):
+        if self.maxsize <= 0:
+            return
+        self._memory[key] = (time.monotonic() + (ttl if ttl is not None else self.ttl_seconds), value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.maxsize:
+            self._memory.popitem(last=False)
+
+    async def _load(self, key: str, compute):
+        coll = get_db()[self.collection]
+        try:
+            doc = await coll.find_one({"_id": key})
+        except PyMongoError as e:
+            logger.warning("Cache %s indisponível para leitura: %s", self.collection, e)
+            doc = None
+        if doc is not None:
+            self.stats["db_hits"] += 1
+            age = (datetime.utcnow() - doc["created_at"]).total_seconds()
+            self._memory_put(key, doc["value"], max(0.0, self.ttl_seconds - age))
+            return doc["value"]
+
+        self.stats["misses"] += 1
+        value = await compute()
+        try:
+            await coll.update_one(
+                {"_id": key},
+                {"$set": {"value": value, "created_at": datetime.utcnow()}},
+                upsert=True,
+            )
+        except PyMongoError as e:
+            logger.warning("Cache %s indisponível para escrita: %s", self.collection, e)
+        self._memory_put(key, value)
+        return value
+
+    async def get_or_compute(self, key: str, compute):
+        value = self._memory_get(key)
+        if value is not None:
+            self.stats["memory_hits"] += 1
+            return value
+
+        task = self._inflight.get(key)
+        if task is not None:
+            self.stats["coalesced"] += 1
+        else:
+            task = asyncio.ensure_future(self._load(key, compute))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        # shield: se um cliente desistir, os demais continuam aguardando a mesma chamada
+        return await asyncio.shield(task)
+
+    def clear(self):
+        self._memory.clear()
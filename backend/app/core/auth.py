@@ -0,0 +1,83 @@
+import hashlib
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from fastapi import Depends, HTTPException
+from fastapi.security import OAuth2PasswordBearer
+from jose import jwt, JWTError
+from .config import get_settings
+
+settings = get_settings()
+oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
+
+@dataclass(frozen=True)
+class Principal:
+    user_id: str
+    expires_at: float  # timestamp (exp do token)
+
+class TokenCache:
+    """Cache LRU de tokens já verificados, indexado pelo digest do token.
+
+    Cada entrada expira junto com o `exp` do próprio JWT, então um token
+    vencido nunca é servido do cache.
+    """
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[bytes, Principal] = OrderedDict()
+
+    @staticmethod
+    def _key(token: str) -> bytes:
+        return hashlib.sha256(token.encode()).digest()
+
+    def get(self, token: str) -> Principal | None:
+        key = self._key(token)
+        principal = self._entries.get(key)
+        if principal is None:
+            self.misses += 1
+            return None
+        if principal.expires_at <= time.time():
+            del self._entries[key]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return principal
+
+    def put(self, token: str, principal: Principal):
+        if self.maxsize <= 0:
+            return
+        key = self._key(token)
+        self._entries[key] = principal
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        self._entries.clear()
+        self.hits = self.misses = 0
+
+    def stats(self) -> dict:
+        return {"size": len(self._entries), "maxsize": self.maxsize, "hits": self.hits, "misses": self.misses}
+
+token_cache = TokenCache(maxsize=settings.TOKEN_CACHE_SIZE)
+
+def decode_token(token: str) -> Principal:
+    cached = token_cache.get(token)
+    if cached is not None:
+        return cached
+    try:
+        payload = jwt.decode(token, settings.JWT_SECRET, algorithms=[settings.JWT_ALG])
+    except JWTError:
+        raise HTTPException(status_code=401, detail="Token inválido")
+    sub, exp = payload.get("sub"), payload.get("exp")
+    if not sub or exp is None:
+        raise HTTPException(status_code=401, detail="Token inválido")
+    principal = Principal(user_id=sub, expires_at=float(exp))
+    token_cache.put(token, principal)
+    return principal
+
+async def get_current_user(token: str = Depends(oauth2_scheme)) -> Principal:
+    return decode_token(token)
@@ -0,0 +1,93 @@
+"""Armazenamento das fotos endereçado por conteúdo, com contagem de referências.
+
+Cada upload é gravado como `<blake2b do conteúdo><extensão>`, então a mesma
+foto enviada várias vezes ocupa um único arquivo. A coleção `blobs` guarda,
+por arquivo, quantas vezes foi enviado e quantas referências (foto de pet ou
+`symptom_photo` do diário) tinha na última coleta.
+
+Coleta de lixo (remove arquivos e derivados sem nenhuma referência):
+    python -m app.core.blobs gc [--dry-run] [--grace-hours 24]
+"""
+import argparse
+import asyncio
+import os
+import re
+from collections import Counter
+from datetime import datetime, timedelta
+from pathlib import Path
+from .db import get_db
+from .images import DERIVED_DIR
+
+STATIC_NAME = re.compile(r"/static/([^/?#]+)")
+
+async def register_upload(name: str, size: int, db=None):
+    db = db if db is not None else get_db()
+    now = datetime.utcnow()
+    await db.blobs.update_one(
+        {"_id": name},
+        {"$inc": {"uploads": 1}, "$set": {"last_upload_at": now},
+         "$setOnInsert": {"size": size, "created_at": now, "refs": 0}},
+        upsert=True,
+    )
+
+def blob_name(path: str | None) -> str | None:
+    """Extrai o nome do arquivo de '/static/<nome>' (relativo ou URL completa)."""
+    match = STATIC_NAME.search(path or "")
+    return match.group(1) if match else None
+
+async def count_references(db=None) -> Counter:
+    db = db if db is not None else get_db()
+    refs: Counter = Counter()
+    async for pet in db.pets.find({"photo": {"$nin": [None, ""]}}, {"photo": 1}):
+        if name := blob_name(pet.get("photo")):
+            refs[name] += 1
+    async for entry in db.diary.find({"symptom_photo": {"$nin": [None, ""]}}, {"symptom_photo": 1}):
+        if name := blob_name(entry.get("symptom_photo")):
+            refs[name] += 1
+    return refs
+
+async def collect_garbage(upload_dir: str, grace: timedelta, dry_run: bool = False, db=None) -> list[str]:
+    """Atualiza `refs` de cada blob e apaga os sem referência mais velhos que `grace`.
+
+    O prazo de carência protege uploads recentes que ainda não foram
+    associados a um pet ou entrada do diário.
+    """
+    db = db if db is not None else get_db()
+    refs = await count_references(db)
+    cutoff = datetime.utcnow() - grace
+    removed = []
+    async for blob in db.blobs.find({}, {"last_upload_at": 1, "refs": 1}):
+        name = blob["_id"]
+        count = refs.get(name, 0)
+        if count or blob.get("last_upload_at", cutoff) > cutoff:
+            if count != blob.get("refs") and not dry_run:
+                await db.blobs.update_one({"_id": name}, {"$set": {"refs": count}})
+            continue
+        removed.append(name)
+        if dry_run:
+            continue
+        for path in [Path(upload_dir) / name, *Path(upload_dir, DERIVED_DIR).glob(f"{name}.*")]:
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass
+        await db.blobs.delete_one({"_id": name})
+    return removed
+
+async def _main(args) -> int:
+    from .config import get_settings
+    removed = await collect_garbage(
+        get_settings().UPLOAD_DIR, timedelta(hours=args.grace_hours), dry_run=args.dry_run
+    )
+    verb = "seriam removidos" if args.dry_run else "removidos"
+    print(f"{len(removed)} arquivo(s) sem referência {verb}")
+    for name in removed:
+        print(f"  {name}")
+    return 0
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("command", choices=["gc"])
+    parser.add_argument("--dry-run", action="store_true")
+    parser.add_argument("--grace-hours", type=float, default=24)
+    raise SystemExit(asyncio.run(_main(parser.parse_args())))
@@ -1,15 +1,57 @@
 from pydantic_settings import BaseSettings
 from functools import lru_cache
+from typing import Optional
 
 class Settings(BaseSettings):
     MONGO_URI: str
     MONGO_DB: str = "petid_db"
+    MONGO_WRITE_W: str = ""  # write concern: "1", "majority"... (vazio = padrão do servidor)
+    MONGO_WRITE_J: Optional[bool] = None  # espera o journal antes de confirmar
     JWT_SECRET: str
     JWT_ALG: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60*24*30
+    TOKEN_CACHE_SIZE: int = 10000  # tokens verificados mantidos em memória (0 desativa)
     UPLOAD_DIR: str = "./app/uploads"
+    UPLOAD_MAX_BYTES: int = 10 * 1024 * 1024
+    UPLOAD_CHUNK_SIZE: int = 256 * 1024  # tamanho dos blocos gravados em disco
+    IMAGE_FORMATS: str = "webp"  # formatos dos derivados, ex.: "avif,webp" (ordem de preferência)
+    IMAGE_QUALITY: int = 75
+    IMAGE_WORKERS: int = 2
+    DIARY_PAGE_SIZE: int = 100  # página padrão quando o cliente pagina (after/before sem limit)
+    DIARY_PAGE_MAX: int = 500
+    DIARY_BULK_MAX_ITEMS: int = 5000  # entradas por requisição em POST /diary/bulk
+    DIARY_BULK_MAX_BYTES: int = 5 * 1024 * 1024
+    DIARY_BULK_CHUNK_SIZE: int = 500  # documentos por insert_many
+    DIARY_EXPORT_BATCH_SIZE: int = 1000  # documentos por lote lido do cursor na exportação
+    REPORT_WORKERS: int = 2  # PDFs renderizados em paralelo (pool de processos)
+    REPORT_CACHE_DIR: str = "./app/cache/reports"
+    REPORT_CACHE_MAX_BYTES: int = 256 * 1024 * 1024
+    PUBLIC_CARD_CACHE_SIZE: int = 2048  # carteirinhas renderizadas em memória
+    PUBLIC_CARD_FRESH_SECONDS: float = 30
+    PUBLIC_CARD_STALE_SECONDS: float = 300  # servidas "velhas" enquanto revalidam
+    PUBLIC_CARD_TIMELINE_SIZE: int = 30
+    PUBLIC_CARD_CHART_POINTS: int = 60  # pontos do gráfico após o downsampling
     ALLOWED_ORIGINS: str = ""  # comma-separated
+    JSON_FAST_PATH: bool = False  # listas serializadas direto (orjson, se instalado), sem revalidar
+    DEBUG: bool = False  # valida também as respostas do caminho rápido contra o response_model
+    METRICS_ENABLED: bool = False  # GET /metrics (Prometheus), protegido por DIAGNOSTICS_TOKEN
+    DIAGNOSTICS_ENABLED: bool = False  # vigia do event loop + /api/admin/profile
+    DIAGNOSTICS_TOKEN: str = ""  # exigido por /api/admin e /metrics (X-Diagnostics-Token ou Bearer)
+    LOOP_LAG_THRESHOLD_MS: float = 100  # bloqueios acima disso são registrados com a pilha
+    PROFILE_INTERVAL_MS: float = 5  # intervalo entre amostras do profiler
+    PROFILE_MAX_SECONDS: float = 60
     OPENAI_API_KEY: str = ""  # OpenAI API Key
+    OPENAI_BASE_URL: str = ""  # vazio = api.openai.com
+    OPENAI_MAX_CONCURRENCY: int = 16  # chamadas simultâneas ao LLM por worker
+    OPENAI_QUEUE_TIMEOUT: float = 10.0  # espera máxima por uma vaga antes de responder 503
+    OPENAI_TIMEOUT: float = 60.0
+    OPENAI_MAX_RETRIES: int = 2
+    WARMUP_IMPORTS: bool = True  # importa o SDK da OpenAI em segundo plano após o startup (senão, na 1ª chamada)
+    VACCINE_CACHE_SIZE: int = 1024  # respostas de /suggest-vaccines em memória
+    VACCINE_CACHE_TTL_DAYS: int = 30
+    PASSWORD_HASH_EXECUTOR: str = "thread"  # "thread" ou "process"
+    PASSWORD_HASH_WORKERS: int = 4
+    PASSWORD_HASH_MAX_PENDING: int = 64  # acima disso o login responde 503
 
     class Config:
         env_file = ".env"
@@ -1,5 +1,8 @@
+from datetime import datetime, timezone
 from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
+from pymongo import WriteConcern
 from .config import get_settings
+from .metrics import db_listener
 
 settings = get_settings()
 _client = None
@@ -8,11 +11,22 @@ _db = None
 def get_client() -> AsyncIOMotorClient:
     global _client
     if _client is None:
-        _client = AsyncIOMotorClient(settings.MONGO_URI)
+        listeners = [db_listener] if settings.METRICS_ENABLED else []
+        _client = AsyncIOMotorClient(settings.MONGO_URI, event_listeners=listeners)
     return _client
 
+def write_concern() -> WriteConcern:
+    w = settings.MONGO_WRITE_W.strip()
+    return WriteConcern(w=int(w) if w.isdigit() else (w or None), j=settings.MONGO_WRITE_J)
+
+def stored_datetime(value: datetime) -> datetime:
+    """A data como o MongoDB a devolve: UTC sem fuso, com precisão de milissegundos."""
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value.replace(microsecond=value.microsecond // 1000 * 1000)
+
 def get_db() -> AsyncIOMotorDatabase:
     global _db
     if _db is None:
-        _db = get_client()[settings.MONGO_DB]
-    return _db
\ No newline at end of file
+        _db = get_client().get_database(settings.MONGO_DB, write_concern=write_concern())
+    return _db
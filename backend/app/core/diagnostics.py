@@ -0,0 +1,149 @@
+"""Diagnóstico de bloqueios do event loop (opt-in: DIAGNOSTICS_ENABLED=true).
+
+- `LoopWatchdog`: uma tarefa no loop atualiza um batimento a cada
+  `interval`; uma thread de vigia percebe quando ele atrasa mais que
+  `threshold`, captura a pilha da thread do loop naquele instante e a rota
+  da requisição em execução, e registra um aviso quando o loop volta.
+- `SamplingProfiler`: amostra a pilha da thread do loop em intervalos fixos
+  por alguns segundos e devolve as pilhas no formato "collapsed" (uma linha
+  `rota;frame;...;frame contagem`), aceito por flamegraph.pl e speedscope.
+
+Só a thread do event loop é observada: trabalho já movido para pools de
+threads/processos não bloqueia o loop e não aparece aqui.
+"""
+import asyncio
+import logging
+import os
+import sys
+import threading
+import time
+import traceback
+from collections import Counter, deque
+from starlette.types import ASGIApp, Receive, Scope, Send
+from .config import get_settings
+from .metrics import route_label
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+# tarefa asyncio -> scope da requisição que ela atende
+_task_scopes: dict[asyncio.Task, Scope] = {}
+
+class TaskRouteMiddleware:
+    """Registra qual requisição cada tarefa do loop está atendendo."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        task = asyncio.current_task()
+        _task_scopes[task] = scope
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _task_scopes.pop(task, None)
+
+def running_route(loop: asyncio.AbstractEventLoop) -> str:
+    """Rota da tarefa que o loop está executando agora (pode ser chamada de outra thread)."""
+    task = asyncio.current_task(loop)
+    if task is None:
+        return "<fora de tarefa>"
+    scope = _task_scopes.get(task)
+    if scope is None:
+        return "<tarefa de fundo>"  # ex.: tarefas filhas de streaming, revalidações de cache
+    return f"{scope['method']} {route_label(scope)}"
+
+def _is_idle(frame) -> bool:
+    # loop parado no select/epoll esperando I/O
+    return frame is not None and os.path.basename(frame.f_code.co_filename) == "selectors.py"
+
+class LoopWatchdog:
+    def __init__(self, threshold: float, max_events: int = 50):
+        self.threshold = threshold
+        self.interval = max(threshold / 4, 0.005)
+        self.events: deque[dict] = deque(maxlen=max_events)
+        self.loop: asyncio.AbstractEventLoop | None = None
+        self.loop_thread: int | None = None
+        self._last_beat = 0.0
+        self._handle: asyncio.TimerHandle | None = None
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self):
+        """Chamar de dentro do loop (ex.: no lifespan)."""
+        self.loop = asyncio.get_running_loop()
+        self.loop_thread = threading.get_ident()
+        self._beat()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._handle is not None:
+            self._handle.cancel()
+        if self._thread is not None:
+            self._thread.join(timeout=1)
+
+    def _beat(self):
+        self._last_beat = time.monotonic()
+        self._handle = self.loop.call_later(self.interval, self._beat)
+
+    def _watch(self):
+        blocked = None
+        while not self._stop.wait(self.interval):
+            lag = time.monotonic() - self._last_beat - self.interval
+            if blocked is None and lag > self.threshold:
+                frame = sys._current_frames().get(self.loop_thread)
+                blocked = {
+                    "route": running_route(self.loop),
+                    "stack": "".join(traceback.format_stack(frame, limit=40)) if frame else "",
+                    "since": self._last_beat + self.interval,
+                }
+            elif blocked is not None and lag <= self.threshold:
+                duration = self._last_beat - blocked["since"]
+                event = {"route": blocked["route"], "duration_ms": round(duration * 1000, 1),
+                         "at": time.time(), "stack": blocked["stack"]}
+                self.events.append(event)
+                logger.warning(
+                    "Event loop bloqueado por %.0f ms em %s; pilha amostrada:\n%s",
+                    event["duration_ms"], event["route"], event["stack"],
+                )
+                blocked = None
+
+class SamplingProfiler:
+    """Amostrador de pilhas da thread do loop; uma coleta por vez."""
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.lock = threading.Lock()
+
+    def collect(self, loop: asyncio.AbstractEventLoop, loop_thread: int, seconds: float,
+                route: str | None = None) -> tuple[Counter, int]:
+        """Roda numa thread própria; retorna (pilhas colapsadas -> contagem, amostras ociosas)."""
+        stacks: Counter = Counter()
+        idle = 0
+        deadline = time.monotonic() + seconds
+        while time.monotonic() < deadline:
+            frame = sys._current_frames().get(loop_thread)
+            if frame is None or _is_idle(frame):
+                idle += 1
+            else:
+                label = running_route(loop)
+                if route is None or route in label:
+                    frames = []
+                    while frame is not None:
+                        code = frame.f_code
+                        frames.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                        frame = frame.f_back
+                    stacks[";".join([label, *reversed(frames)])] += 1
+            time.sleep(self.interval)
+        return stacks, idle
+
+def collapsed(stacks: Counter) -> str:
+    return "".join(f"{stack.replace(chr(10), ' ')} {count}\n" for stack, count in stacks.most_common())
+
+watchdog = LoopWatchdog(threshold=settings.LOOP_LAG_THRESHOLD_MS / 1000)
+profiler = SamplingProfiler(interval=settings.PROFILE_INTERVAL_MS / 1000)
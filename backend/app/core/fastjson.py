@@ -0,0 +1,51 @@
+"""Caminho rápido de serialização JSON para listas grandes (opt-in: JSON_FAST_PATH=true).
+
+As rotas devolvem uma `FastJSONResponse` já pronta, e o FastAPI pula a
+revalidação pelo `response_model` e o `jsonable_encoder`. O `response_model`
+continua declarado na rota e documenta o formato no OpenAPI. Com DEBUG=true
+cada resposta ainda é validada contra o modelo para pegar divergências.
+
+Os dados já saem filtrados pelos normalizadores das rotas (só os campos do
+schema). Usa o orjson (em requirements.txt), com ObjectId e datetime tratados
+nativamente; se não estiver instalado, cai no `json` da biblioteca padrão.
+"""
+import json
+from datetime import date, datetime
+from typing import Any
+from bson import ObjectId
+from pydantic import TypeAdapter
+from starlette.responses import JSONResponse
+from .config import get_settings
+
+try:
+    import orjson
+except ImportError:  # opcional
+    orjson = None
+
+settings = get_settings()
+_adapters: dict[Any, TypeAdapter] = {}
+
+def _default(value):
+    if isinstance(value, ObjectId):
+        return str(value)
+    if orjson is None and isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"Tipo não serializável em JSON: {type(value).__name__}")
+
+def dumps(content) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(content, default=_default)
+    return json.dumps(content, default=_default, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+class FastJSONResponse(JSONResponse):
+    def render(self, content) -> bytes:
+        return dumps(content)
+
+def fast_json(content, model=None, **kwargs) -> FastJSONResponse:
+    """Resposta JSON sem passar pelo response_model; valida contra `model` só em DEBUG."""
+    if settings.DEBUG and model is not None:
+        adapter = _adapters.get(model)
+        if adapter is None:
+            adapter = _adapters[model] = TypeAdapter(model)
+        adapter.validate_python(content)
+    return FastJSONResponse(content, **kwargs)
@@ -0,0 +1,79 @@
+"""Derivados das fotos enviadas: miniaturas e versões comprimidas em WebP/AVIF.
+
+Os arquivos ficam em `UPLOAD_DIR/_derived/<nome>.<tamanho>.<formato>` e são
+servidos por /static com `?size=<tamanho>` (ver app.core.static). Para gerar
+os derivados de fotos enviadas antes desta versão:
+    python -m app.core.images backfill
+"""
+import argparse
+import asyncio
+import os
+from pathlib import Path
+from PIL import Image, ImageOps
+
+DERIVED_DIR = "_derived"
+# tamanho -> (lado em px, recorte quadrado)
+RENDITIONS = {
+    "thumb": (128, True),
+    "small": (320, False),
+    "medium": (800, False),
+}
+IMAGE_SUFFIXES = {".jpg", ".jpeg", ".png", ".gif", ".webp"}
+
+def parse_formats(value: str) -> list[str]:
+    return [f.strip().lower() for f in value.split(",") if f.strip()]
+
+def derived_name(filename: str, size: str, fmt: str) -> str:
+    return f"{DERIVED_DIR}/{filename}.{size}.{fmt}"
+
+def render_derivatives(src_path: str, upload_dir: str, formats: list[str], quality: int) -> list[str]:
+    """Gera todos os tamanhos de `src_path` e retorna os caminhos relativos criados.
+
+    Roda no pool de processos. A orientação EXIF é aplicada aos pixels e os
+    metadados (EXIF, GPS etc.) não são copiados para os derivados.
+    """
+    out_dir = Path(upload_dir) / DERIVED_DIR
+    out_dir.mkdir(parents=True, exist_ok=True)
+    filename = Path(src_path).name
+    created = []
+    with Image.open(src_path) as im:
+        im.seek(0)  # GIFs animados: só o primeiro quadro
+        im = ImageOps.exif_transpose(im)
+        im = im.convert("RGBA" if im.mode in ("RGBA", "LA", "P") else "RGB")
+        for size, (px, square) in RENDITIONS.items():
+            if square:
+                rendition = ImageOps.fit(im, (px, px), Image.Resampling.LANCZOS)
+            else:
+                rendition = im.copy()
+                rendition.thumbnail((px, px), Image.Resampling.LANCZOS)
+            for fmt in formats:
+                rel = derived_name(filename, size, fmt)
+                dest = Path(upload_dir) / rel
+                tmp = dest.with_name(f".{dest.name}.tmp")
+                rendition.save(tmp, format=fmt.upper(), quality=quality)
+                os.replace(tmp, dest)
+                created.append(rel)
+    return created
+
+async def _backfill(upload_dir: str, formats: list[str], quality: int):
+    from .pool import ProcessPool
+    pool = ProcessPool(workers=os.cpu_count() or 1)
+    sources = [p for p in Path(upload_dir).iterdir() if p.is_file() and p.suffix.lower() in IMAGE_SUFFIXES]
+    try:
+        results = await asyncio.gather(
+            *(pool.run(render_derivatives, str(p), upload_dir, formats, quality) for p in sources),
+            return_exceptions=True,
+        )
+    finally:
+        pool.shutdown()
+    for src, result in zip(sources, results):
+        status = f"erro: {result}" if isinstance(result, Exception) else f"{len(result)} derivados"
+        print(f"{src.name}: {status}")
+
+if __name__ == "__main__":
+    from .config import get_settings
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("command", choices=["backfill"])
+    parser.parse_args()
+    settings = get_settings()
+    asyncio.run(_backfill(settings.UPLOAD_DIR, parse_formats(settings.IMAGE_FORMATS), settings.IMAGE_QUALITY))
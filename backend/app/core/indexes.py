@@ -0,0 +1,97 @@
+"""Índices do MongoDB e verificação dos planos de consulta das rotas.
+
+Criação (também executada em segundo plano no startup da API):
+    python -m app.core.indexes create
+
+Verificação (falha se alguma consulta cair em COLLSCAN):
+    python -m app.core.indexes check
+"""
+import argparse
+import asyncio
+import logging
+import sys
+from bson import ObjectId
+from pymongo import ASCENDING, DESCENDING, IndexModel
+from pymongo.errors import ConnectionFailure, PyMongoError
+from .config import get_settings
+from .db import get_db
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+INDEXES: dict[str, list[IndexModel]] = {
+    # _id no fim desempata a paginação por cursor em (date, _id) sem SORT em memória
+    "diary": [IndexModel([("pet_id", ASCENDING), ("date", ASCENDING), ("_id", ASCENDING)], name="pet_id_date_id")],
+    "pets": [IndexModel([("owner_id", ASCENDING)], name="owner_id")],
+    "users": [IndexModel([("email", ASCENDING)], name="email_unique", unique=True)],
+    "ai_cache": [
+        IndexModel([("created_at", ASCENDING)], name="created_at_ttl",
+                   expireAfterSeconds=settings.VACCINE_CACHE_TTL_DAYS * 24 * 3600),
+    ],
+}
+
+# (rota, coleção, filtro, ordenação) – mesmos formatos usados pelos handlers
+ROUTE_QUERIES = [
+    ("auth.login", "users", {"email": "explain@petid.local"}, None),
+    ("pets.list_pets", "pets", {"owner_id": ObjectId()}, None),
+    ("diary.get_entries", "diary", {"pet_id": ObjectId()}, [("date", ASCENDING), ("_id", ASCENDING)]),
+    ("reports.diary_report", "diary", {"pet_id": ObjectId()}, [("date", ASCENDING)]),
+    ("public.public_pet_card", "diary", {"pet_id": ObjectId()}, [("date", DESCENDING), ("_id", DESCENDING)]),
+]
+
+async def ensure_indexes(db=None):
+    db = db if db is not None else get_db()
+    for collection, models in INDEXES.items():
+        try:
+            await db[collection].create_indexes(models)
+        except ConnectionFailure as e:
+            # MongoDB inacessível: as demais coleções falhariam do mesmo jeito
+            logger.error("Falha ao criar índices, MongoDB inacessível: %s", e)
+            return
+        except PyMongoError as e:
+            # ex.: e-mails duplicados impedem o índice único; a API sobe mesmo assim
+            logger.error("Falha ao criar índices em %s: %s", collection, e)
+
+def _plan_stages(plan) -> list[str]:
+    stages = []
+    if isinstance(plan, dict):
+        if "stage" in plan:
+            stages.append(plan["stage"])
+        for value in plan.values():
+            stages.extend(_plan_stages(value))
+    elif isinstance(plan, list):
+        for value in plan:
+            stages.extend(_plan_stages(value))
+    return stages
+
+async def check_query_plans(db=None) -> list[tuple[str, list[str]]]:
+    """Executa explain() nas consultas das rotas e retorna as que usam COLLSCAN."""
+    db = db if db is not None else get_db()
+    failures = []
+    for route, collection, query, sort in ROUTE_QUERIES:
+        cursor = db[collection].find(query)
+        if sort:
+            cursor = cursor.sort(sort)
+        explain = await cursor.explain()
+        stages = _plan_stages(explain.get("queryPlanner", {}).get("winningPlan", {}))
+        print(f"{route:28} {collection:8} {' > '.join(stages)}")
+        if "COLLSCAN" in stages:
+            failures.append((route, stages))
+    return failures
+
+async def _main(command: str) -> int:
+    if command in ("create", "all"):
+        await ensure_indexes()
+        print("Índices criados/atualizados.")
+    if command in ("check", "all"):
+        failures = await check_query_plans()
+        if failures:
+            print(f"{len(failures)} consulta(s) sem índice: {', '.join(r for r, _ in failures)}")
+            return 1
+        print("Todas as consultas usam índice.")
+    return 0
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("command", choices=["create", "check", "all"])
+    sys.exit(asyncio.run(_main(parser.parse_args().command)))
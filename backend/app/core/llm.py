@@ -0,0 +1,141 @@
+"""Cliente da OpenAI compartilhado pelo processo.
+
+O SDK (openai + httpx) leva centenas de ms para importar e só é carregado quando a
+primeira chamada ao LLM precisa dele, numa thread para não travar o loop.
+Com WARMUP_IMPORTS=true a importação começa em segundo plano logo após o
+startup, sem atrasá-lo.
+"""
+from __future__ import annotations
+
+import asyncio
+import time
+from typing import TYPE_CHECKING
+import anyio
+from fastapi import HTTPException
+from .config import get_settings
+from .metrics import openai_duration
+
+if TYPE_CHECKING:
+    from openai import AsyncOpenAI
+
+settings = get_settings()
+
+_client: AsyncOpenAI | None = None
+_semaphore: asyncio.Semaphore | None = None
+_sdk: asyncio.Future | None = None
+
+def require_api_key():
+    if not settings.OPENAI_API_KEY:
+        raise HTTPException(
+            status_code=500,
+            detail="OPENAI_API_KEY não configurada. Configure no arquivo .env"
+        )
+
+def _import_sdk():
+    import httpx  # noqa: F401
+    import openai  # noqa: F401
+
+def _start_sdk_import() -> asyncio.Future:
+    global _sdk
+    if _sdk is None:
+        _sdk = asyncio.ensure_future(asyncio.to_thread(_import_sdk))
+    return _sdk
+
+async def _ready_client() -> AsyncOpenAI:
+    require_api_key()
+    # shield: cancelar uma requisição não cancela a importação que as outras esperam
+    await asyncio.shield(_start_sdk_import())
+    return get_openai_client()
+
+def get_openai_client() -> AsyncOpenAI:
+    """Cliente AsyncOpenAI único do processo, com pool de conexões httpx compartilhado."""
+    global _client
+    if _client is None:
+        require_api_key()
+        import httpx
+        from openai import AsyncOpenAI
+
+        http_client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=settings.OPENAI_MAX_CONCURRENCY,
+                max_keepalive_connections=settings.OPENAI_MAX_CONCURRENCY,
+            ),
+            timeout=settings.OPENAI_TIMEOUT,
+        )
+        _client = AsyncOpenAI(
+            api_key=settings.OPENAI_API_KEY,
+            base_url=settings.OPENAI_BASE_URL or None,
+            timeout=settings.OPENAI_TIMEOUT,
+            max_retries=settings.OPENAI_MAX_RETRIES,
+            http_client=http_client,
+        )
+    return _client
+
+def _get_semaphore() -> asyncio.Semaphore:
+    global _semaphore
+    if _semaphore is None:
+        _semaphore = asyncio.Semaphore(settings.OPENAI_MAX_CONCURRENCY)
+    return _semaphore
+
+async def _acquire_slot() -> asyncio.Semaphore:
+    semaphore = _get_semaphore()
+    try:
+        await asyncio.wait_for(semaphore.acquire(), timeout=settings.OPENAI_QUEUE_TIMEOUT)
+    except asyncio.TimeoutError:
+        raise HTTPException(
+            status_code=503,
+            detail="Assistente indisponível no momento, tente novamente",
+            headers={"Retry-After": "5"},
+        )
+    return semaphore
+
+async def chat_completion(**kwargs):
+    """Chama chat.completions.create respeitando o limite global de chamadas simultâneas."""
+    client = await _ready_client()
+    semaphore = await _acquire_slot()
+    start, outcome = time.perf_counter(), "error"
+    try:
+        response = await client.chat.completions.create(timeout=settings.OPENAI_TIMEOUT, **kwargs)
+        outcome = "ok"
+        return response
+    finally:
+        semaphore.release()
+        openai_duration.observe(("chat", outcome), time.perf_counter() - start)
+
+async def stream_chat_completion(**kwargs):
+    """Gera os trechos de texto da resposta conforme chegam (stream=True).
+
+    Se o consumidor for cancelado (cliente desconectou), o stream HTTP com a
+    OpenAI é fechado e a geração é interrompida no servidor deles.
+    """
+    client = await _ready_client()
+    semaphore = await _acquire_slot()
+    start, outcome = time.perf_counter(), "error"
+    try:
+        stream = await client.chat.completions.create(stream=True, timeout=settings.OPENAI_TIMEOUT, **kwargs)
+        try:
+            async for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+            outcome = "ok"
+        except (asyncio.CancelledError, GeneratorExit):
+            outcome = "cancelled"
+            raise
+        finally:
+            with anyio.CancelScope(shield=True):
+                await stream.close()
+    finally:
+        semaphore.release()
+        openai_duration.observe(("stream", outcome), time.perf_counter() - start)
+
+async def init_openai_client():
+    if settings.OPENAI_API_KEY and settings.WARMUP_IMPORTS:
+        _start_sdk_import()
+
+async def close_openai_client():
+    global _client, _semaphore, _sdk
+    if _client is not None:
+        await _client.close()
+    _client = None
+    _semaphore = None
+    _sdk = None
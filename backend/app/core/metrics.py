@@ -0,0 +1,197 @@
+"""Métricas da API no formato texto do Prometheus (GET /metrics).
+
+Por rota (o template, ex. `/api/pets/{pet_id}/vaccines`):
+- latência, tamanho da resposta e requisições em andamento;
+- comandos enviados ao MongoDB e tempo gasto neles por requisição, via
+  monitoramento de comandos do PyMongo (o Motor repassa os contextvars para
+  as threads do executor, então cada comando é atribuído à sua requisição).
+
+Fora das rotas, a duração das chamadas à OpenAI (app.core.llm) e os acertos/
+falhas do cache de tokens JWT (app.core.auth).
+
+Sem dependências externas: histogramas simples em memória, por processo.
+Com vários workers, cada um expõe os próprios números.
+"""
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from dataclasses import dataclass
+from pymongo import monitoring
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from .auth import token_cache
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+DB_OPS_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 50, 100)
+DB_TIME_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5)
+OPENAI_BUCKETS = (0.25, 0.5, 1, 2, 4, 8, 15, 30, 60, 120)
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def _format_labels(names: tuple[str, ...], values: tuple, extra: str = "") -> str:
+    parts = [f'{n}="{_escape(str(v))}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+class Histogram:
+    def __init__(self, name: str, help: str, labels: tuple[str, ...], buckets: tuple[float, ...]):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.buckets = buckets
+        # valores dos labels -> [contagem por balde..., soma, total]
+        self._series: dict[tuple, list] = {}
+
+    def observe(self, labels: tuple, value: float):
+        series = self._series.get(labels)
+        if series is None:
+            series = self._series[labels] = [0] * len(self.buckets) + [0.0, 0]
+        i = bisect_left(self.buckets, value)
+        if i < len(self.buckets):
+            series[i] += 1
+        series[-2] += value
+        series[-1] += 1
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for labels, series in sorted(self._series.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets, series):
+                cumulative += count
+                le = 'le="%s"' % bound
+                lines.append(f"{self.name}_bucket{_format_labels(self.labels, labels, le)} {cumulative}")
+            le = 'le="+Inf"'
+            lines.append(f"{self.name}_bucket{_format_labels(self.labels, labels, le)} {series[-1]}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labels, labels)} {series[-2]}")
+            lines.append(f"{self.name}_count{_format_labels(self.labels, labels)} {series[-1]}")
+        return lines
+
+request_duration = Histogram(
+    "petid_http_request_duration_seconds", "Tempo até o último byte da resposta.",
+    ("method", "route", "status"), LATENCY_BUCKETS,
+)
+response_size = Histogram(
+    "petid_http_response_size_bytes", "Tamanho do corpo da resposta.", ("method", "route"), SIZE_BUCKETS,
+)
+db_commands = Histogram(
+    "petid_db_commands_per_request", "Comandos enviados ao MongoDB por requisição.", ("method", "route"), DB_OPS_BUCKETS,
+)
+db_time = Histogram(
+    "petid_db_time_per_request_seconds", "Tempo em comandos do MongoDB por requisição.", ("method", "route"), DB_TIME_BUCKETS,
+)
+openai_duration = Histogram(
+    "petid_openai_request_duration_seconds", "Duração das chamadas à OpenAI (streams: até o fim).",
+    ("kind", "outcome"), OPENAI_BUCKETS,
+)
+HISTOGRAMS = [request_duration, response_size, db_commands, db_time, openai_duration]
+
+@dataclass
+class RequestStats:
+    db_commands: int = 0
+    db_time: float = 0.0
+
+_current: ContextVar[RequestStats | None] = ContextVar("petid_request_stats", default=None)
+# requisições em andamento; a rota é lida do scope só na coleta (o roteador a preenche
+# depois que o middleware começa – antes disso a requisição aparece como "<unmatched>")
+_active: dict[int, Scope] = {}
+
+class DBCommandListener(monitoring.CommandListener):
+    """Soma comandos e tempo do MongoDB na requisição do contexto atual."""
+
+    def started(self, event):
+        pass
+
+    def succeeded(self, event):
+        stats = _current.get()
+        if stats is not None:
+            stats.db_commands += 1
+            stats.db_time += event.duration_micros / 1_000_000
+
+    def failed(self, event):
+        self.succeeded(event)
+
+db_listener = DBCommandListener()
+
+def route_label(scope: Scope) -> str:
+    route = scope.get("route")
+    if route is not None:
+        return route.path
+    # Mount (ex.: /static) não grava a rota, só ajusta o root_path
+    return scope.get("root_path") or "<unmatched>"
+
+class MetricsMiddleware:
+    """Middleware ASGI puro: mede cada requisição HTTP sem bufferizar a resposta."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        start = time.perf_counter()
+        stats = RequestStats()
+        token = _current.set(stats)
+        _active[id(scope)] = scope
+        status = 500
+        content_length = None
+        body_bytes = 0
+        finished = 0.0
+
+        async def send_wrapper(message: Message):
+            nonlocal status, content_length, body_bytes, finished
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                for name, value in message.get("headers", ()):
+                    if name == b"content-length":
+                        content_length = int(value)  # pathsend/zerocopy não passam o corpo por aqui
+            elif message["type"] == "http.response.body":
+                body_bytes += len(message.get("body", b""))
+                if not message.get("more_body", False):
+                    finished = time.perf_counter()
+            elif message["type"] in ("http.response.pathsend", "http.response.zerocopy"):
+                finished = time.perf_counter()
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _active.pop(id(scope), None)
+            _current.reset(token)
+            # tarefas de fundo rodam depois do último byte: não entram na latência
+            elapsed = (finished or time.perf_counter()) - start
+            method, route = scope["method"], route_label(scope)
+            request_duration.observe((method, route, status), elapsed)
+            response_size.observe((method, route), content_length if content_length is not None else body_bytes)
+            db_commands.observe((method, route), stats.db_commands)
+            db_time.observe((method, route), stats.db_time)
+
+def render() -> str:
+    lines = []
+    for histogram in HISTOGRAMS:
+        lines.extend(histogram.render())
+    in_flight: dict[tuple, int] = {}
+    for scope in list(_active.values()):
+        key = (scope["method"], route_label(scope))
+        in_flight[key] = in_flight.get(key, 0) + 1
+    lines.append("# HELP petid_http_requests_in_flight Requisições HTTP em andamento.")
+    lines.append("# TYPE petid_http_requests_in_flight gauge")
+    for labels, count in sorted(in_flight.items()):
+        lines.append(f"petid_http_requests_in_flight{_format_labels(('method', 'route'), labels)} {count}")
+    lines.extend(_token_cache_lines())
+    return "\n".join(lines) + "\n"
+
+def _token_cache_lines() -> list[str]:
+    stats = token_cache.stats()
+    series = [
+        ("petid_token_cache_hits_total", "counter", "Tokens JWT resolvidos pelo cache.", stats["hits"]),
+        ("petid_token_cache_misses_total", "counter", "Tokens JWT decodificados e verificados.", stats["misses"]),
+        ("petid_token_cache_entries", "gauge", "Tokens no cache.", stats["size"]),
+        ("petid_token_cache_max_entries", "gauge", "Capacidade do cache de tokens.", stats["maxsize"]),
+    ]
+    lines = []
+    for name, kind, help_text, value in series:
+        lines += [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}", f"{name} {value}"]
+    return lines
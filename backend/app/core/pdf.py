@@ -0,0 +1,59 @@
+from datetime import datetime
+
+def render_diary_pdf(path: str, pet_name: str, entries: list[dict], generated_at: datetime, summary: dict | None = None) -> int:
+    """Desenha o relatório do diário em `path` e retorna o tamanho do arquivo.
+
+    Roda dentro do pool de processos: recebe apenas dados simples (picklable).
+    `summary` é o resumo de app.core.pet_stats (contagem, período e médias).
+    O reportlab é importado aqui: só os processos do pool o carregam, não o
+    worker da API.
+    """
+    from reportlab.lib.pagesizes import A4
+    from reportlab.pdfgen import canvas
+    from reportlab.lib.units import cm
+
+    c = canvas.Canvas(path, pagesize=A4)
+    w, h = A4
+
+    title = f"Relatório de Recuperação - {pet_name}"
+    c.setFont("Helvetica-Bold", 16)
+    c.drawString(2*cm, h-2*cm, title)
+    c.setFont("Helvetica", 10)
+    c.drawString(2*cm, h-2.6*cm, f"Gerado em: {generated_at.strftime('%d/%m/%Y %H:%M UTC')}")
+    top = h-2.8*cm
+    if summary:
+        try:
+            period = f"{summary['first_date'].strftime('%d/%m/%Y')} – {summary['last_date'].strftime('%d/%m/%Y')}"
+        except Exception:
+            period = "—"
+        score = summary["averages"].get("score")
+        score_text = f"{score:.1f}" if score is not None else "—"
+        c.drawString(2*cm, h-3.2*cm, f"Entradas: {summary['count']} | Período: {period} | Índice médio (apetite+energia): {score_text}")
+        top = h-3.4*cm
+    c.line(2*cm, top, w-2*cm, top)
+
+    y = top-0.7*cm
+    c.setFont("Helvetica-Bold", 12)
+    c.drawString(2*cm, y, "Entradas:")
+    y -= 0.5*cm
+    c.setFont("Helvetica", 10)
+    for e in entries:
+        try:
+            dt = e["date"].strftime("%d/%m/%Y %H:%M")
+        except Exception:
+            dt = str(e["date"])
+        line = f"- {dt} | Apetite: {e.get('appetite','?')} | Energia: {e.get('energy','?')} | Medicação: {'Sim' if e.get('medication') else 'Não'}"
+        if y < 3*cm:
+            c.showPage(); y = h-2*cm
+        c.drawString(2*cm, y, line); y -= 0.5*cm
+        notes = e.get("notes")
+        if notes:
+            for i in range(0, len(notes), 90):
+                chunk = notes[i:i+90]
+                if y < 3*cm: c.showPage(); y = h-2*cm
+                c.drawString(3*cm, y, f"Obs: {chunk}"); y -= 0.5*cm
+
+    c.showPage(); c.save()
+    with open(path, "rb") as f:
+        f.seek(0, 2)
+        return f.tell()
@@ -0,0 +1,165 @@
+"""Resumo do diário por pet (coleção `pet_stats`), mantido a cada escrita.
+
+Um documento por pet (`_id` = pet_id como gravado no diário) com contagem,
+primeira/última data, último _id, somas de apetite/energia/índice (as médias
+saem de soma/contagem) e baldes diários em `days.<AAAA-MM-DD>`. A carteirinha
+pública e o relatório PDF leem só este documento em vez de varrer o diário.
+
+Pets com entradas anteriores a esta versão ganham o resumo na primeira
+leitura ou escrita (montado a partir do diário). `version` é incrementada a
+cada escrita, e o recálculo só substitui o documento se ela não mudou no meio.
+Para recalcular tudo (ex.: após correções manuais no diário):
+    python -m app.core.pet_stats rebuild
+"""
+import argparse
+import asyncio
+from datetime import datetime
+from pymongo.errors import DuplicateKeyError
+from .db import get_db, stored_datetime
+
+# apetite/energia -> pontos do índice (apetite+energia)/2
+LEVEL_SCORE = {"high": 3, "mid": 2, "low": 1}
+SUM_FIELDS = ("count", "appetite_sum", "energy_sum", "score_sum")
+
+def level_score(value) -> int:
+    return LEVEL_SCORE.get(value, 0) if isinstance(value, str) else 0
+
+def accumulate(stats: dict, entry: dict) -> dict:
+    """Soma uma entrada do diário a um resumo em memória e o retorna."""
+    appetite, energy = level_score(entry.get("appetite")), level_score(entry.get("energy"))
+    score = (appetite + energy) / 2
+    stats["count"] = stats.get("count", 0) + 1
+    stats["appetite_sum"] = stats.get("appetite_sum", 0) + appetite
+    stats["energy_sum"] = stats.get("energy_sum", 0) + energy
+    stats["score_sum"] = stats.get("score_sum", 0) + score
+    if "_id" in entry and ("last_id" not in stats or entry["_id"] > stats["last_id"]):
+        stats["last_id"] = entry["_id"]
+    date = entry.get("date")
+    if isinstance(date, datetime):
+        date = stored_datetime(date)  # datas com fuso (ex.: "...Z") viram UTC, como as lidas do diário
+        if "first_date" not in stats or date < stats["first_date"]:
+            stats["first_date"] = date
+        if "last_date" not in stats or date > stats["last_date"]:
+            stats["last_date"] = date
+        day = stats.setdefault("days", {}).setdefault(date.strftime("%Y-%m-%d"), {"count": 0, "score_sum": 0})
+        day["count"] += 1
+        day["score_sum"] += score
+    return stats
+
+def update_for(stats: dict) -> dict:
+    """Update do Mongo que soma o resumo `stats` (de uma ou mais entradas) ao documento."""
+    inc = {field: stats[field] for field in SUM_FIELDS if field in stats}
+    for day, bucket in stats.get("days", {}).items():
+        inc[f"days.{day}.count"] = bucket["count"]
+        inc[f"days.{day}.score_sum"] = bucket["score_sum"]
+    inc["version"] = 1
+    update = {"$inc": inc, "$set": {"updated_at": datetime.utcnow()}}
+    if "first_date" in stats:
+        update["$min"] = {"first_date": stats["first_date"]}
+    maxima = {f: stats[f] for f in ("last_date", "last_id") if f in stats}
+    if maxima:
+        update["$max"] = maxima
+    return update
+
+async def record_entries(entries: list[dict], db=None):
+    """Atualiza o resumo dos pets das entradas recém-inseridas (um update por pet)."""
+    db = db if db is not None else get_db()
+    per_pet: dict = {}
+    for entry in entries:
+        accumulate(per_pet.setdefault(entry["pet_id"], {}), entry)
+    for pet_key, stats in per_pet.items():
+        update = update_for(stats)
+        result = await db.pet_stats.update_one({"_id": pet_key}, update)
+        if not result.matched_count:
+            # Sem resumo ainda (pet novo ou com entradas antigas): as novas entradas já
+            # estão no diário, então o recálculo completo (protegido por `version`) as inclui
+            await rebuild(pet_key, db)
+
+async def compute_stats(pet_key, db=None) -> dict:
+    db = db if db is not None else get_db()
+    stats: dict = {}
+    async for entry in db.diary.find({"pet_id": pet_key}, {"date": 1, "appetite": 1, "energy": 1}):
+        accumulate(stats, entry)
+    return stats
+
+async def _insert_base(pet_key, stats: dict, db):
+    # $setOnInsert: não sobrescreve um resumo criado por uma escrita concorrente
+    await db.pet_stats.update_one(
+        {"_id": pet_key},
+        {"$setOnInsert": {**stats, "version": 0, "updated_at": datetime.utcnow()}},
+        upsert=True,
+    )
+
+async def get_pet_stats(pet_key, db=None) -> dict:
+    """Resumo do pet; calcula a partir do diário se o documento ainda não existir."""
+    db = db if db is not None else get_db()
+    doc = await db.pet_stats.find_one({"_id": pet_key})
+    if doc is not None:
+        return doc
+    stats = await compute_stats(pet_key, db)
+    if stats:
+        await _insert_base(pet_key, stats, db)
+    return {"_id": pet_key, **stats}
+
+def averages(stats: dict) -> dict:
+    count = stats.get("count", 0)
+    if not count:
+        return {"appetite": None, "energy": None, "score": None}
+    return {
+        "appetite": stats.get("appetite_sum", 0) / count,
+        "energy": stats.get("energy_sum", 0) / count,
+        "score": stats.get("score_sum", 0) / count,
+    }
+
+def daily_scores(stats: dict) -> list[tuple[datetime, float]]:
+    """Índice médio de cada dia com entradas, em ordem cronológica."""
+    return [
+        (datetime.strptime(day, "%Y-%m-%d"), bucket["score_sum"] / bucket["count"])
+        for day, bucket in sorted(stats.get("days", {}).items())
+        if bucket.get("count")
+    ]
+
+async def rebuild(pet_key, db=None, attempts: int = 5) -> bool:
+    """Recalcula o resumo a partir do diário sem apagar escritas concorrentes.
+
+    A substituição só acontece se `version` não mudou durante o recálculo; se
+    mudou (um $inc chegou no meio), o cálculo é refeito.
+    """
+    db = db if db is not None else get_db()
+    for _ in range(attempts):
+        current = await db.pet_stats.find_one({"_id": pet_key}, {"version": 1})
+        stats = await compute_stats(pet_key, db)
+        if current is None:
+            try:
+                await db.pet_stats.insert_one({"_id": pet_key, **stats, "version": 0, "updated_at": datetime.utcnow()})
+                return True
+            except DuplicateKeyError:
+                continue
+        version = current.get("version")  # None casa também documentos sem o campo
+        result = await db.pet_stats.replace_one(
+            {"_id": pet_key, "version": version},
+            {**stats, "version": (version or 0) + 1, "updated_at": datetime.utcnow()},
+        )
+        if result.matched_count:
+            return True
+    return False
+
+async def rebuild_all(db=None) -> tuple[int, list]:
+    """Recalcula todos os resumos; retorna (recalculados, pets que não estabilizaram)."""
+    db = db if db is not None else get_db()
+    count, busy = 0, []
+    for pet_key in await db.diary.distinct("pet_id"):
+        if await rebuild(pet_key, db):
+            count += 1
+        else:
+            busy.append(pet_key)
+    return count, busy
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("command", choices=["rebuild"])
+    parser.parse_args()
+    count, busy = asyncio.run(rebuild_all())
+    print(f"{count} resumo(s) recalculado(s)")
+    if busy:
+        print(f"{len(busy)} pet(s) com escritas contínuas, rode de novo: {', '.join(map(str, busy))}")
@@ -0,0 +1,33 @@
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+class ProcessPool:
+    """Pool de processos para trabalho pesado de CPU (PDFs, imagens).
+
+    `workers` limita quantas tarefas rodam ao mesmo tempo; as demais
+    aguardam no semáforo sem ocupar o event loop.
+    """
+
+    def __init__(self, workers: int):
+        self.workers = workers
+        self._semaphore = asyncio.Semaphore(workers)
+        self._executor: ProcessPoolExecutor | None = None
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # spawn: o processo filho não herda threads do Motor/uvicorn
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._executor
+
+    async def run(self, fn, *args):
+        async with self._semaphore:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._get_executor(), fn, *args)
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
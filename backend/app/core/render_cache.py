@@ -0,0 +1,93 @@
+import asyncio
+import hashlib
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from .config import get_settings
+
+settings = get_settings()
+
+@dataclass
+class Rendered:
+    body: str
+    etag: str
+    stamp: object
+    rendered_at: float
+
+class RenderCache:
+    """Cache de páginas renderizadas com semântica stale-while-revalidate.
+
+    Até `fresh_seconds` a entrada é servida direto da memória. Entre
+    `fresh_seconds` e `fresh_seconds + stale_seconds` ela ainda é servida,
+    mas uma revalidação roda em segundo plano: primeiro calcula o carimbo de
+    versão (barato) e só renderiza de novo se ele mudou. As escritas chamam
+    `invalidate` para a próxima leitura já sair atualizada neste processo.
+    """
+
+    def __init__(self, maxsize: int, fresh_seconds: float, stale_seconds: float):
+        self.maxsize = maxsize
+        self.fresh_seconds = fresh_seconds
+        self.stale_seconds = stale_seconds
+        self.stats = {"hits": 0, "stale_hits": 0, "misses": 0, "renders": 0}
+        self._entries: OrderedDict[str, Rendered] = OrderedDict()
+        self._inflight: dict[str, asyncio.Future] = {}
+
+    async def get(self, key: str, stamp_fn, render_fn) -> Rendered:
+        entry = self._entries.get(key)
+        if entry is not None:
+            age = time.monotonic() - entry.rendered_at
+            if age < self.fresh_seconds:
+                self.stats["hits"] += 1
+                self._entries.move_to_end(key)
+                return entry
+            if age < self.fresh_seconds + self.stale_seconds:
+                self.stats["stale_hits"] += 1
+                self._refresh(key, stamp_fn, render_fn, entry)
+                return entry
+        self.stats["misses"] += 1
+        return await asyncio.shield(self._refresh(key, stamp_fn, render_fn, entry))
+
+    def _refresh(self, key: str, stamp_fn, render_fn, entry: Rendered | None) -> asyncio.Future:
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._render(key, stamp_fn, render_fn, entry))
+            self._inflight[key] = task
+
+            def done(t: asyncio.Future):
+                if self._inflight.get(key) is t:
+                    del self._inflight[key]
+                if not t.cancelled():
+                    t.exception()  # revalidação de fundo que falhou não gera aviso de exceção não lida
+            task.add_done_callback(done)
+        return task
+
+    async def _render(self, key: str, stamp_fn, render_fn, entry: Rendered | None) -> Rendered:
+        stamp = await stamp_fn()
+        if entry is not None and entry.stamp == stamp and key in self._entries:
+            entry.rendered_at = time.monotonic()
+            return entry
+        body = await render_fn()
+        self.stats["renders"] += 1
+        rendered = Rendered(
+            body=body,
+            etag=f'"{hashlib.sha256(body.encode()).hexdigest()[:32]}"',
+            stamp=stamp,
+            rendered_at=time.monotonic(),
+        )
+        if self._inflight.get(key) is not asyncio.current_task():
+            return rendered  # invalidado durante a renderização: não guarda
+        self._entries[key] = rendered
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+        return rendered
+
+    def invalidate(self, key: str):
+        self._entries.pop(key, None)
+        self._inflight.pop(key, None)
+
+public_cards = RenderCache(
+    maxsize=settings.PUBLIC_CARD_CACHE_SIZE,
+    fresh_seconds=settings.PUBLIC_CARD_FRESH_SECONDS,
+    stale_seconds=settings.PUBLIC_CARD_STALE_SECONDS,
+)
@@ -0,0 +1,62 @@
+import hashlib
+import os
+import tempfile
+from pathlib import Path
+
+class ReportCache:
+    """Cache em disco de PDFs gerados, endereçado pelo conteúdo de origem.
+
+    A chave já incorpora a versão do diário (quantidade de entradas, último
+    `_id`/data), então uma entrada nova gera outra chave e o arquivo antigo
+    apenas envelhece até ser despejado. O despejo é LRU pelo mtime, que é
+    atualizado a cada acerto, até o total caber em `max_bytes`.
+    """
+
+    def __init__(self, directory: str, max_bytes: int):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+
+    @staticmethod
+    def make_key(*parts) -> str:
+        return hashlib.sha256("|".join(str(p) for p in parts).encode()).hexdigest()[:32]
+
+    def path_for(self, key: str) -> Path:
+        return self.directory / f"{key}.pdf"
+
+    def get(self, key: str) -> Path | None:
+        path = self.path_for(key)
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        return path
+
+    def temp_path(self) -> str:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        fd, path = tempfile.mkstemp(dir=self.directory, prefix=".tmp_", suffix=".pdf")
+        os.close(fd)
+        return path
+
+    def commit(self, temp_path: str, key: str) -> Path:
+        path = self.path_for(key)
+        os.replace(temp_path, path)
+        self.evict(keep=path)
+        return path
+
+    def evict(self, keep: Path | None = None):
+        files = []
+        total = 0
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(".pdf") and not entry.name.startswith(".tmp_"):
+                st = entry.stat()
+                total += st.st_size
+                if entry.path != str(keep):
+                    files.append((st.st_mtime, st.st_size, entry.path))
+        files.sort()
+        while total > self.max_bytes and files:
+            _, size, path = files.pop(0)
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass
+            total -= size
@@ -1,4 +1,8 @@
+import asyncio
+import multiprocessing
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
 from datetime import datetime, timedelta
+from fastapi import HTTPException
 from passlib.context import CryptContext
 from jose import jwt
 from .config import get_settings
@@ -15,4 +19,66 @@ def verify_password(plain: str, hashed: str) -> bool:
     return pwd_context.verify(plain, hashed)
 
 def hash_password(plain: str) -> str:
-    return pwd_context.hash(plain)
\ No newline at end of file
+    return pwd_context.hash(plain)
+
+class PasswordHasher:
+    """Executa o bcrypt fora do event loop, em um pool dedicado e com fila limitada.
+
+    Quando há mais de `max_pending` operações aguardando, novas chamadas
+    falham com 503 em vez de acumular latência para o resto da API.
+    """
+
+    def __init__(self, workers: int, max_pending: int, executor: str = "thread"):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.executor_kind = executor
+        self.pending = 0
+        self._executor: Executor | None = None
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self.executor_kind == "process":
+                # spawn: o processo filho não herda threads do Motor/uvicorn (fork pode travar)
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+                )
+            else:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="pwd-hash")
+        return self._executor
+
+    async def _run(self, fn, *args):
+        if self.pending >= self.max_pending:
+            raise HTTPException(
+                status_code=503,
+                detail="Serviço de autenticação sobrecarregado, tente novamente",
+                headers={"Retry-After": "1"},
+            )
+        self.pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._get_executor(), fn, *args)
+        finally:
+            self.pending -= 1
+
+    async def hash(self, plain: str) -> str:
+        return await self._run(hash_password, plain)
+
+    async def verify(self, plain: str, hashed: str) -> bool:
+        return await self._run(verify_password, plain, hashed)
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+password_hasher = PasswordHasher(
+    workers=settings.PASSWORD_HASH_WORKERS,
+    max_pending=settings.PASSWORD_HASH_MAX_PENDING,
+    executor=settings.PASSWORD_HASH_EXECUTOR,
+)
+
+async def hash_password_async(plain: str) -> str:
+    return await password_hasher.hash(plain)
+
+async def verify_password_async(plain: str, hashed: str) -> bool:
+    return await password_hasher.verify(plain, hashed)
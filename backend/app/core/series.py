@@ -0,0 +1,50 @@
+"""Séries temporais do diário para gráficos com quantidade fixa de pontos.
+
+Os baldes diários vêm do resumo em `pet_stats` (ver app.core.pet_stats); em
+históricos longos eles são agrupados por semana e o resultado é reduzido com
+LTTB (Largest-Triangle-Three-Buckets), que preserva picos e vales melhor do
+que pegar um ponto a cada N.
+"""
+from datetime import datetime, timedelta
+
+# históricos mais longos que isso são agrupados por semana ISO
+WEEKLY_AFTER_DAYS = 180
+
+def weekly(points: list[tuple[datetime, float]]) -> list[tuple[datetime, float]]:
+    """Média dos pontos diários por semana, datada pela segunda-feira."""
+    weeks: dict[datetime, list[float]] = {}
+    for day, value in points:
+        weeks.setdefault(day - timedelta(days=day.weekday()), []).append(value)
+    return [(week, sum(values) / len(values)) for week, values in sorted(weeks.items())]
+
+def lttb(points: list[tuple[float, float]], threshold: int) -> list[int]:
+    """Índices dos pontos escolhidos pelo LTTB (sempre inclui o primeiro e o último)."""
+    n = len(points)
+    if threshold >= n or threshold < 3:
+        return list(range(n))
+    every = (n - 2) / (threshold - 2)
+    selected = [0]
+    a = 0
+    for i in range(threshold - 2):
+        # média do próximo balde é o terceiro vértice do triângulo
+        start = int((i + 1) * every) + 1
+        end = min(int((i + 2) * every) + 1, n)
+        avg_x = sum(p[0] for p in points[start:end]) / (end - start)
+        avg_y = sum(p[1] for p in points[start:end]) / (end - start)
+        ax, ay = points[a]
+        best, best_area = -1, -1.0
+        for j in range(int(i * every) + 1, int((i + 1) * every) + 1):
+            x, y = points[j]
+            area = abs((ax - avg_x) * (y - ay) - (ax - x) * (avg_y - ay))
+            if area > best_area:
+                best, best_area = j, area
+        selected.append(best)
+        a = best
+    selected.append(n - 1)
+    return selected
+
+def downsample(daily: list[tuple[datetime, float]], max_points: int) -> list[tuple[datetime, float]]:
+    if daily and (daily[-1][0] - daily[0][0]).days > WEEKLY_AFTER_DAYS:
+        daily = weekly(daily)
+    keep = lttb([(d.timestamp(), v) for d, v in daily], max_points)
+    return [daily[i] for i in keep]
@@ -0,0 +1,147 @@
+import os
+import re
+import anyio
+from fastapi.staticfiles import StaticFiles
+from starlette.staticfiles import NotModifiedResponse
+from starlette.datastructures import Headers, QueryParams
+from starlette.exceptions import HTTPException
+from starlette.responses import FileResponse, Response
+from starlette.types import Receive, Scope, Send
+from .images import DERIVED_DIR, RENDITIONS, derived_name
+from .uploads import PARTIAL_DIR
+
+# Nomes gerados pelo upload começam com 32 hex (hash do conteúdo ou uuid4)
+CONTENT_ADDRESSED = re.compile(r"^[0-9a-f]{32}\.")
+IMMUTABLE = "public, max-age=31536000, immutable"
+DERIVED_CACHE = "public, max-age=604800"
+FALLBACK_CACHE = "public, max-age=300"
+RANGE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+class RangeFileResponse(FileResponse):
+    """FileResponse com suporte a um intervalo de bytes (206) e envio zero-copy.
+
+    Usa as extensões ASGI `http.response.pathsend`/`http.response.zerocopy`
+    quando o servidor as oferece; caso contrário lê o arquivo em blocos.
+    """
+
+    def __init__(self, path, *, stat_result: os.stat_result, byte_range: tuple[int, int] | None = None, **kwargs):
+        super().__init__(path, stat_result=stat_result, **kwargs)
+        self.headers["accept-ranges"] = "bytes"
+        self.byte_range = byte_range
+        if byte_range is not None:
+            start, end = byte_range
+            self.status_code = 206
+            self.headers["content-range"] = f"bytes {start}-{end}/{stat_result.st_size}"
+            self.headers["content-length"] = str(end - start + 1)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        extensions = scope.get("extensions") or {}
+        if self.byte_range is None and "http.response.pathsend" in extensions:
+            return await super().__call__(scope, receive, send)
+
+        await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+        start, end = self.byte_range or (0, self.stat_result.st_size - 1)
+        remaining = end - start + 1
+        if scope["method"].upper() == "HEAD" or remaining <= 0:
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+        elif "http.response.zerocopy" in extensions:
+            file = await anyio.to_thread.run_sync(open, self.path, "rb")
+            try:
+                await send({"type": "http.response.zerocopy", "file": file.fileno(), "offset": start, "count": remaining})
+            finally:
+                file.close()
+        else:
+            async with await anyio.open_file(self.path, mode="rb") as file:
+                await file.seek(start)
+                while remaining > 0:
+                    chunk = await file.read(min(self.chunk_size, remaining))
+                    if not chunk:
+                        break
+                    remaining -= len(chunk)
+                    await send({"type": "http.response.body", "body": chunk, "more_body": remaining > 0})
+                if remaining > 0:
+                    await send({"type": "http.response.body", "body": b"", "more_body": False})
+        if self.background is not None:
+            await self.background()
+
+def parse_range(header: str, size: int) -> tuple[int, int] | None:
+    """Interpreta `Range: bytes=a-b` (um único intervalo). None = resposta completa."""
+    match = RANGE.match(header.strip())
+    if not match:
+        return None  # ausente, malformado ou múltiplos intervalos: envia tudo
+    first, last = match.groups()
+    if first:
+        start = int(first)
+        end = min(int(last), size - 1) if last else size - 1
+    elif last:
+        start, end = max(0, size - int(last)), size - 1
+    else:
+        return None
+    if start >= size or start > end:
+        raise HTTPException(status_code=416, headers={"Content-Range": f"bytes */{size}"})
+    return start, end
+
+class MediaFiles(StaticFiles):
+    """StaticFiles das fotos enviadas, com derivados escolhidos por `?size=`.
+
+    `/static/<foto>?size=thumb` devolve a miniatura em AVIF ou WebP conforme o
+    header Accept do cliente; se o derivado ainda não existir (pipeline em
+    andamento ou foto antiga), cai de volta no original.
+
+    Arquivos endereçados por conteúdo nunca mudam, então vão com
+    `Cache-Control: immutable` de 1 ano e ETag forte derivado do nome;
+    requisições condicionais recebem 304 e `Range` recebe 206. Arquivos
+    parciais de uploads em andamento (`PARTIAL_DIR`) nunca são servidos.
+    """
+
+    def __init__(self, *args, formats: list[str], **kwargs):
+        super().__init__(*args, **kwargs)
+        self.formats = formats
+
+    async def get_response(self, path: str, scope: Scope):
+        if path.split(os.sep, 1)[0] == PARTIAL_DIR:
+            raise HTTPException(status_code=404)  # uploads ainda sendo recebidos
+        size = QueryParams(scope["query_string"]).get("size")
+        if size in RENDITIONS and os.sep not in path:
+            accept = Headers(scope=scope).get("accept", "")
+            for fmt in self.preferred_formats(accept):
+                try:
+                    response = await super().get_response(derived_name(path, size, fmt), scope)
+                except HTTPException as e:
+                    if e.status_code != 404:
+                        raise
+                    continue
+                response.headers["Vary"] = "Accept"
+                return response
+            # derivado ainda não gerado: o original não pode ficar em cache nesta URL
+            response = await super().get_response(path, scope)
+            response.headers["Cache-Control"] = FALLBACK_CACHE
+            response.headers["Vary"] = "Accept"
+            return response
+        return await super().get_response(path, scope)
+
+    def preferred_formats(self, accept: str) -> list[str]:
+        # AVIF só para quem anuncia suporte; WebP é aceito por todos os clientes do app
+        return [f for f in self.formats if f != "avif" or "image/avif" in accept]
+
+    def file_response(self, full_path, stat_result: os.stat_result, scope: Scope, status_code: int = 200) -> Response:
+        request_headers = Headers(scope=scope)
+        name = os.path.basename(full_path)
+        is_derived = os.path.basename(os.path.dirname(full_path)) == DERIVED_DIR
+        headers = {}
+        if CONTENT_ADDRESSED.match(name):
+            headers["Cache-Control"] = DERIVED_CACHE if is_derived else IMMUTABLE
+            headers["ETag"] = f'"{name}"'
+
+        response = RangeFileResponse(full_path, stat_result=stat_result, status_code=status_code, headers=headers)
+        if self.is_not_modified(response.headers, request_headers):
+            return NotModifiedResponse(response.headers)
+
+        if_range = request_headers.get("if-range")
+        if "range" in request_headers and (if_range is None or if_range == response.headers.get("etag")):
+            byte_range = parse_range(request_headers["range"], stat_result.st_size)
+            if byte_range is not None:
+                return RangeFileResponse(
+                    full_path, stat_result=stat_result, headers=headers, byte_range=byte_range
+                )
+        return response
@@ -0,0 +1,146 @@
+import hashlib
+import os
+import tempfile
+from pathlib import Path
+import anyio
+from fastapi import HTTPException, Request
+from python_multipart.multipart import MultipartParser, parse_options_header
+
+# Assinaturas (magic bytes) dos formatos aceitos -> extensão gravada
+IMAGE_SIGNATURES = [
+    (b"\xff\xd8\xff", ".jpg"),
+    (b"\x89PNG\r\n\x1a\n", ".png"),
+    (b"GIF87a", ".gif"),
+    (b"GIF89a", ".gif"),
+]
+SNIFF_BYTES = 12
+# Uploads em andamento: subdiretório do destino (mesmo sistema de arquivos, para
+# o os.replace final ser atômico) que o MediaFiles não serve
+PARTIAL_DIR = "_partial"
+
+# Declaração do corpo para o OpenAPI, já que a rota lê o multipart manualmente
+MULTIPART_FILE_BODY = {
+    "requestBody": {
+        "required": True,
+        "content": {
+            "multipart/form-data": {
+                "schema": {
+                    "type": "object",
+                    "required": ["file"],
+                    "properties": {"file": {"type": "string", "format": "binary"}},
+                }
+            }
+        },
+    }
+}
+
+def sniff_image(head: bytes) -> str | None:
+    for signature, suffix in IMAGE_SIGNATURES:
+        if head.startswith(signature):
+            return suffix
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return ".webp"
+    return None
+
+def _too_large(max_bytes: int) -> HTTPException:
+    return HTTPException(status_code=413, detail=f"Arquivo maior que o limite de {max_bytes // (1024 * 1024)} MB")
+
+def _create_partial(partial_dir: Path) -> str:
+    partial_dir.mkdir(parents=True, exist_ok=True)
+    fd, path = tempfile.mkstemp(dir=partial_dir, prefix=".upload-", suffix=".part")
+    os.close(fd)
+    return path
+
+async def receive_image(request: Request, dest_dir: Path, max_bytes: int, chunk_size: int, field: str = "file") -> tuple[str, str, str]:
+    """Lê o campo `field` de um multipart direto do socket para um arquivo temporário.
+
+    O corpo nunca é carregado inteiro em memória: os dados são gravados em
+    blocos de ~`chunk_size` bytes (em thread, via anyio) e a leitura é
+    interrompida com 413 assim que `max_bytes` é ultrapassado. O formato é
+    decidido pelos magic bytes, não pela extensão do nome do arquivo.
+    Retorna (caminho temporário em `dest_dir/PARTIAL_DIR`, extensão
+    detectada, hash BLAKE2b do conteúdo calculado durante a leitura).
+    """
+    content_type, params = parse_options_header(request.headers.get("content-type", ""))
+    if content_type != b"multipart/form-data" or b"boundary" not in params:
+        raise HTTPException(status_code=400, detail="Envie o arquivo como multipart/form-data")
+    declared = request.headers.get("content-length")
+    if declared and declared.isdigit() and int(declared) > max_bytes + 64 * 1024:
+        raise _too_large(max_bytes)
+
+    state = {"headers": [], "field": b"", "value": b"", "target": False, "found": False}
+    pending: list[bytes] = []
+
+    def on_header_field(data, start, end):
+        state["field"] += data[start:end]
+
+    def on_header_value(data, start, end):
+        state["value"] += data[start:end]
+
+    def on_header_end():
+        state["headers"].append((state["field"].lower(), state["value"]))
+        state["field"] = state["value"] = b""
+
+    def on_headers_finished():
+        disposition = dict(state["headers"]).get(b"content-disposition", b"")
+        _, options = parse_options_header(disposition)
+        state["target"] = not state["found"] and options.get(b"name") == field.encode() and b"filename" in options
+        state["found"] = state["found"] or state["target"]
+        state["headers"] = []
+
+    def on_part_data(data, start, end):
+        if state["target"]:
+            pending.append(data[start:end])
+
+    def on_part_end():
+        state["target"] = False
+
+    parser = MultipartParser(params[b"boundary"], {
+        "on_header_field": on_header_field,
+        "on_header_value": on_header_value,
+        "on_header_end": on_header_end,
+        "on_headers_finished": on_headers_finished,
+        "on_part_data": on_part_data,
+        "on_part_end": on_part_end,
+    })
+
+    tmp_path = await anyio.to_thread.run_sync(_create_partial, dest_dir / PARTIAL_DIR)
+    size = 0
+    head = b""
+    buffer = bytearray()
+    digest = hashlib.blake2b(digest_size=16)
+
+    def drain():
+        nonlocal size, head
+        for data in pending:
+            size += len(data)
+            if size > max_bytes:
+                raise _too_large(max_bytes)
+            if len(head) < SNIFF_BYTES:
+                head += data[:SNIFF_BYTES - len(head)]
+            digest.update(data)
+            buffer.extend(data)
+        pending.clear()
+
+    try:
+        async with await anyio.open_file(tmp_path, "wb") as f:
+            async for chunk in request.stream():
+                parser.write(chunk)
+                drain()
+                if len(buffer) >= chunk_size:
+                    await f.write(bytes(buffer))
+                    buffer.clear()
+            parser.finalize()
+            drain()
+            if buffer:
+                await f.write(bytes(buffer))
+
+        if not state["found"]:
+            raise HTTPException(status_code=400, detail=f"Campo '{field}' com arquivo não enviado")
+        suffix = sniff_image(head)
+        if suffix is None:
+            raise HTTPException(status_code=400, detail="Formato não suportado")
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+    return tmp_path, suffix, digest.hexdigest()
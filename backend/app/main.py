@@ -1,11 +1,35 @@
-from fastapi import FastAPI
+import asyncio
+from contextlib import asynccontextmanager
+from fastapi import Depends, FastAPI
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
 from app.core.config import get_settings
-from app.routes import auth, pets, diary, upload, reports, public, ai
+from app.core.images import parse_formats
+from app.core.indexes import ensure_indexes
+from app.core.llm import init_openai_client, close_openai_client
+from app.core import metrics, diagnostics
+from app.core.security import password_hasher
+from app.core.static import MediaFiles
+from app.routes import auth, pets, diary, upload, reports, public, ai, admin
 
 settings = get_settings()
-app = FastAPI(title="PetID API", version="1.0.0")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # em segundo plano: o startup não espera o MongoDB (erros só vão para o log)
+    indexes_task = asyncio.create_task(ensure_indexes())
+    await init_openai_client()
+    if settings.DIAGNOSTICS_ENABLED:
+        diagnostics.watchdog.start()
+    yield
+    indexes_task.cancel()
+    diagnostics.watchdog.stop()
+    await close_openai_client()
+    password_hasher.shutdown()
+    reports.renderer.shutdown()
+    upload.image_pool.shutdown()
+
+app = FastAPI(title="PetID API", version="1.0.0", lifespan=lifespan)
 
 origins = [o.strip() for o in settings.ALLOWED_ORIGINS.split(",") if o.strip()]
 app.add_middleware(
@@ -14,9 +38,18 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "X-Prev-Cursor"],
 )
+if settings.DIAGNOSTICS_ENABLED:
+    app.add_middleware(diagnostics.TaskRouteMiddleware)
+if settings.METRICS_ENABLED:
+    app.add_middleware(metrics.MetricsMiddleware)  # adicionado por último = mais externo, mede também o CORS
 
-app.mount("/static", StaticFiles(directory=settings.UPLOAD_DIR), name="static")
+app.mount(
+    "/static",
+    MediaFiles(directory=settings.UPLOAD_DIR, formats=parse_formats(settings.IMAGE_FORMATS)),
+    name="static",
+)
 
 @app.get("/")
 def root():
@@ -26,6 +59,11 @@ def root():
 def api_root():
     return {"status": "ok", "name": "PetID API"}
 
+if settings.METRICS_ENABLED:
+    @app.get("/metrics", include_in_schema=False, dependencies=[Depends(admin.require_diagnostics_token)])
+    def prometheus_metrics():
+        return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
 app.include_router(auth.router, prefix="/api")
 app.include_router(pets.router, prefix="/api")
 app.include_router(diary.router, prefix="/api")
@@ -33,4 +71,6 @@ app.include_router(upload.router, prefix="/api")
 app.include_router(reports.router, prefix="/api")
 app.include_router(ai.router, prefix="/api")
 app.include_router(public.router, prefix="/api")
+if settings.DIAGNOSTICS_ENABLED:
+    app.include_router(admin.router, prefix="/api")
 app.include_router(public.router)  # Mantém também sem /api para compatibilidade
\ No newline at end of file
@@ -48,4 +48,16 @@ class DiaryEntryIn(BaseModel):
     notes: Optional[str] = None
 
 class DiaryEntryOut(DiaryEntryIn):
-    id: str
\ No newline at end of file
+    id: str
+
+class DiaryBulkItem(BaseModel):
+    index: int
+    status: str  # "created", "error" ou "skipped"
+    id: Optional[str] = None
+    error: Optional[str] = None
+
+class DiaryBulkOut(BaseModel):
+    inserted: int
+    failed: int  # itens com status "error"
+    skipped: int  # não avaliados no modo ordenado, depois do primeiro erro
+    results: List[DiaryBulkItem]
@@ -0,0 +1,48 @@
+import secrets
+import time
+from typing import Optional
+import anyio
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from fastapi.responses import PlainTextResponse
+from app.core.config import get_settings
+from app.core.diagnostics import watchdog, profiler, collapsed
+
+settings = get_settings()
+
+def require_diagnostics_token(x_diagnostics_token: str = Header(""), authorization: str = Header("")):
+    """Exige DIAGNOSTICS_TOKEN no header X-Diagnostics-Token ou como `Authorization: Bearer`
+    (forma que o Prometheus envia em /metrics); sem token configurado, nega tudo."""
+    scheme, _, credentials = authorization.partition(" ")
+    token = x_diagnostics_token or (credentials if scheme.lower() == "bearer" else "")
+    if not settings.DIAGNOSTICS_TOKEN or not secrets.compare_digest(token, settings.DIAGNOSTICS_TOKEN):
+        raise HTTPException(status_code=403, detail="Acesso negado")
+
+router = APIRouter(prefix="/admin", tags=["admin"], dependencies=[Depends(require_diagnostics_token)])
+
+@router.get("/loop-lag")
+async def loop_lag_events():
+    """Bloqueios recentes do event loop (mais recentes primeiro)."""
+    return {"threshold_ms": watchdog.threshold * 1000, "events": list(reversed(watchdog.events))}
+
+@router.get("/profile", response_class=PlainTextResponse)
+async def profile(
+    seconds: float = Query(10, gt=0, le=settings.PROFILE_MAX_SECONDS),
+    route: Optional[str] = Query(None, description="Filtra amostras cuja rota contenha este texto"),
+):
+    """Amostra a thread do event loop por `seconds` e devolve as pilhas colapsadas por rota.
+
+    Visualize com `flamegraph.pl arquivo.folded > grafico.svg` ou em https://www.speedscope.app.
+    """
+    if not profiler.lock.acquire(blocking=False):
+        raise HTTPException(status_code=409, detail="Já existe uma coleta em andamento")
+    try:
+        stacks, idle = await anyio.to_thread.run_sync(
+            profiler.collect, watchdog.loop, watchdog.loop_thread, seconds, route
+        )
+    finally:
+        profiler.lock.release()
+    return PlainTextResponse(collapsed(stacks), headers={
+        "Content-Disposition": f'attachment; filename="petid-{int(time.time())}.folded"',
+        "X-Profile-Samples": str(sum(stacks.values())),
+        "X-Profile-Idle-Samples": str(idle),
+    })
@@ -1,21 +1,15 @@
 from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-from openai import OpenAI
+import json
+import re
+import unicodedata
+from app.core.ai_cache import TwoTierCache
 from app.core.config import get_settings
+from app.core.llm import chat_completion, require_api_key, stream_chat_completion
 
 router = APIRouter()
-
-# Função para obter cliente OpenAI (lazy initialization)
-def get_openai_client():
-    settings = get_settings()
-    api_key = settings.OPENAI_API_KEY
-    
-    if not api_key or api_key == "":
-        raise HTTPException(
-            status_code=500,
-            detail="OPENAI_API_KEY não configurada. Configure no arquivo .env"
-        )
-    return OpenAI(api_key=api_key)
+settings = get_settings()
 
 class HealthCheckRequest(BaseModel):
     eating_normally: str  # "yes", "no", "maybe"
@@ -41,41 +35,65 @@ class VaccineRequest(BaseModel):
     pet_breed: str = ""
     pet_age: str = ""
 
-@router.post("/ai-diagnosis")
-async def ai_diagnosis(request: HealthCheckRequest):
-    """
-    Gera diagnóstico veterinário usando OpenAI GPT-4
+def sse_event(data: dict, event: str | None = None) -> str:
+    payload = f"data: {json.dumps(data, ensure_ascii=False)}\n\n"
+    return f"event: {event}\n{payload}" if event else payload
+
+def sse_response(start: dict, **kwargs) -> StreamingResponse:
+    """Repassa os tokens do modelo como Server-Sent Events à medida que chegam.
+
+    O evento `start` sai imediatamente (primeiro byte sem esperar o LLM). Se o
+    cliente desconectar, o Starlette cancela o gerador e o stream da OpenAI
+    é fechado, interrompendo a geração.
     """
-    try:
-        # Obter cliente OpenAI
-        client = get_openai_client()
-        
-        # Construir prompt detalhado
-        symptoms = []
-        
-        if request.eating_normally == "no":
-            symptoms.append("não está comendo")
-        elif request.eating_normally == "maybe":
-            symptoms.append("está comendo menos que o normal")
-        
-        if request.energy_level == "yes":
-            symptoms.append("está mais quieto/apático que o normal")
-        elif request.energy_level == "maybe":
-            symptoms.append("apresenta leve redução de energia")
-            
-        if request.vomit_diarrhea == "yes":
-            symptoms.append("teve vômito ou diarreia nas últimas 24h")
-        elif request.vomit_diarrhea == "maybe":
-            symptoms.append("teve leve desconforto gastrointestinal")
-            
-        if request.pain_signs == "yes":
-            symptoms.append("apresenta sinais de dor (mancar, sensibilidade, gemido)")
-        elif request.pain_signs == "maybe":
-            symptoms.append("apresenta desconforto leve")
+    require_api_key()  # falha com 500 antes de abrir o stream se não houver chave
+
+    async def events():
+        yield sse_event(start, "start")
+        try:
+            async for token in stream_chat_completion(**kwargs):
+                yield sse_event({"delta": token})
+        except HTTPException as e:
+            yield sse_event({"detail": e.detail}, "error")
+            return
+        except Exception as e:
+            yield sse_event({"detail": f"Erro ao gerar resposta: {str(e)}"}, "error")
+            return
+        yield sse_event({"success": True}, "done")
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+def build_diagnosis_messages(request: HealthCheckRequest) -> tuple[list[dict], str]:
+    # Construir prompt detalhado
+    symptoms = []
+    
+    if request.eating_normally == "no":
+        symptoms.append("não está comendo")
+    elif request.eating_normally == "maybe":
+        symptoms.append("está comendo menos que o normal")
+    
+    if request.energy_level == "yes":
+        symptoms.append("está mais quieto/apático que o normal")
+    elif request.energy_level == "maybe":
+        symptoms.append("apresenta leve redução de energia")
         
-        symptoms_text = ", ".join(symptoms) if symptoms else "nenhum sintoma significativo"
+    if request.vomit_diarrhea == "yes":
+        symptoms.append("teve vômito ou diarreia nas últimas 24h")
+    elif request.vomit_diarrhea == "maybe":
+        symptoms.append("teve leve desconforto gastrointestinal")
         
-        prompt = f"""Você é um assistente veterinário experiente. Analise os seguintes sintomas de {request.pet_name} ({request.pet_species}):
+    if request.pain_signs == "yes":
+        symptoms.append("apresenta sinais de dor (mancar, sensibilidade, gemido)")
+    elif request.pain_signs == "maybe":
+        symptoms.append("apresenta desconforto leve")
+    
+    symptoms_text = ", ".join(symptoms) if symptoms else "nenhum sintoma significativo"
+    
+    prompt = f"""Você é um assistente veterinário experiente. Analise os seguintes sintomas de {request.pet_name} ({request.pet_species}):
 
 Sintomas relatados: {symptoms_text}
 
@@ -89,19 +107,58 @@ Por favor, forneça:
 
 Seja claro, objetivo e empático. Sempre lembre que este é um guia inicial e não substitui consulta veterinária presencial."""
 
+    messages = [
+        {
+            "role": "system", 
+            "content": "Você é um assistente veterinário virtual que ajuda tutores a avaliar a saúde de seus pets. Seja claro, empático e sempre recomende cuidado veterinário quando apropriado."
+        },
+        {
+            "role": "user", 
+            "content": prompt
+        }
+    ]
+    return messages, symptoms_text
+
+def build_chat_messages(request: ChatRequest) -> list[dict]:
+    # Construir mensagens para o modelo
+    messages = [
+        {
+            "role": "system",
+            "content": f"Você é um assistente veterinário virtual especializado que está ajudando o tutor de {request.pet_name}, um(a) {request.pet_species}. Seja claro, empático e sempre recomende cuidado veterinário presencial quando apropriado. Responda de forma concisa e objetiva."
+        }
+    ]
+    
+    # Adicionar histórico de conversa
+    for msg in request.messages:
+        messages.append({
+            "role": msg.role,
+            "content": msg.content
+        })
+    
+    # Adicionar nova mensagem do usuário
+    messages.append({
+        "role": "user",
+        "content": request.new_message
+    })
+    return messages
+
+@router.post("/ai-diagnosis")
+async def ai_diagnosis(request: HealthCheckRequest, stream: bool = False):
+    """
+    Gera diagnóstico veterinário usando OpenAI GPT-4.
+    Com `?stream=true` a resposta é enviada via SSE, token a token.
+    """
+    messages, symptoms_text = build_diagnosis_messages(request)
+    if stream:
+        return sse_response(
+            {"symptoms_analyzed": symptoms_text},
+            model="gpt-4o-mini", messages=messages, temperature=0.7, max_tokens=800
+        )
+    try:
         # Chamar OpenAI
-        response = client.chat.completions.create(
+        response = await chat_completion(
             model="gpt-4o-mini",
-            messages=[
-                {
-                    "role": "system", 
-                    "content": "Você é um assistente veterinário virtual que ajuda tutores a avaliar a saúde de seus pets. Seja claro, empático e sempre recomende cuidado veterinário quando apropriado."
-                },
-                {
-                    "role": "user", 
-                    "content": prompt
-                }
-            ],
+            messages=messages,
             temperature=0.7,
             max_tokens=800
         )
@@ -114,6 +171,8 @@ Seja claro, objetivo e empático. Sempre lembre que este é um guia inicial e n
             "symptoms_analyzed": symptoms_text
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=500,
@@ -122,38 +181,18 @@ Seja claro, objetivo e empático. Sempre lembre que este é um guia inicial e n
 
 
 @router.post("/ai-chat")
-async def ai_chat(request: ChatRequest):
+async def ai_chat(request: ChatRequest, stream: bool = False):
     """
     Endpoint de chat interativo para diagnóstico veterinário.
     Mantém contexto da conversa e permite perguntas de follow-up.
+    Com `?stream=true` a resposta é enviada via SSE, token a token.
     """
+    messages = build_chat_messages(request)
+    if stream:
+        return sse_response({}, model="gpt-4o-mini", messages=messages, temperature=0.7, max_tokens=600)
     try:
-        # Obter cliente OpenAI
-        client = get_openai_client()
-        
-        # Construir mensagens para o modelo
-        messages = [
-            {
-                "role": "system",
-                "content": f"Você é um assistente veterinário virtual especializado que está ajudando o tutor de {request.pet_name}, um(a) {request.pet_species}. Seja claro, empático e sempre recomende cuidado veterinário presencial quando apropriado. Responda de forma concisa e objetiva."
-            }
-        ]
-        
-        # Adicionar histórico de conversa
-        for msg in request.messages:
-            messages.append({
-                "role": msg.role,
-                "content": msg.content
-            })
-        
-        # Adicionar nova mensagem do usuário
-        messages.append({
-            "role": "user",
-            "content": request.new_message
-        })
-        
         # Chamar OpenAI
-        response = client.chat.completions.create(
+        response = await chat_completion(
             model="gpt-4o-mini",
             messages=messages,
             temperature=0.7,
@@ -167,6 +206,8 @@ async def ai_chat(request: ChatRequest):
             "response": ai_response
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=500,
@@ -174,22 +215,88 @@ async def ai_chat(request: ChatRequest):
         )
 
 
+SPECIES_ALIASES = {
+    "cachorro": "cachorro", "cao": "cachorro", "cadela": "cachorro", "canino": "cachorro", "dog": "cachorro",
+    "gato": "gato", "gata": "gato", "felino": "gato", "cat": "gato",
+}
+MIXED_BREEDS = {"", "srd", "sem raca", "sem raca definida", "vira-lata", "vira lata", "mestico", "mista"}
+# Faixas usadas na chave do cache e no prompt
+AGE_BUCKETS = ["filhote (até 4 meses)", "jovem (4 a 12 meses)", "adulto (1 a 7 anos)", "idoso (8 anos ou mais)"]
+# meses por unidade, pelo começo da palavra (texto já sem acentos)
+AGE_UNITS = [("ano", 12), ("year", 12), ("mes", 1), ("month", 1), ("semana", 1 / 4.3), ("week", 1 / 4.3),
+             ("dia", 1 / 30), ("day", 1 / 30)]
+AGE_PART = re.compile(r"(\d+(?:[.,]\d+)?)\s*([a-z]*)")
+
+def normalize_text(value: str) -> str:
+    """Minúsculas, sem acentos e com espaços colapsados."""
+    value = unicodedata.normalize("NFKD", value.casefold())
+    value = "".join(c for c in value if not unicodedata.combining(c))
+    return " ".join(value.split())
+
+def age_in_months(age: str) -> float | None:
+    """Soma cada par número/unidade ("1 ano e 6 meses" = 18); sem unidade conhecida, vale anos."""
+    parts = AGE_PART.findall(normalize_text(age))
+    if not parts:
+        return None
+    months = None
+    for number, word in parts:
+        unit = next((m for prefix, m in AGE_UNITS if word.startswith(prefix)), None)
+        if unit is not None:
+            months = (months or 0) + float(number.replace(",", ".")) * unit
+    if months is None:
+        months = float(parts[0][0].replace(",", ".")) * 12  # "2", "2a"
+    return months
+
+def bucket_for_months(months: float) -> str:
+    # limites como nos rótulos: 4 e 12 meses ainda ficam na faixa de baixo; 8 anos já é idoso
+    if months <= 4:
+        return AGE_BUCKETS[0]
+    if months <= 12:
+        return AGE_BUCKETS[1]
+    if months < 96:
+        return AGE_BUCKETS[2]
+    return AGE_BUCKETS[3]
+
+def age_bucket(age: str) -> str | None:
+    months = age_in_months(age)
+    if months is None:
+        return AGE_BUCKETS[0] if "filhote" in normalize_text(age) else None
+    return bucket_for_months(months)
+
+def normalize_vaccine_request(request: VaccineRequest) -> tuple[str, str, str | None]:
+    species = normalize_text(request.pet_species)
+    species = SPECIES_ALIASES.get(species, species)
+    breed = normalize_text(request.pet_breed)
+    breed = "srd" if breed in MIXED_BREEDS else breed
+    return species, breed, age_bucket(request.pet_age)
+
+vaccine_cache = TwoTierCache(
+    "ai_cache",
+    maxsize=settings.VACCINE_CACHE_SIZE,
+    ttl_seconds=settings.VACCINE_CACHE_TTL_DAYS * 24 * 3600,
+)
+
 @router.post("/suggest-vaccines")
 async def suggest_vaccines(request: VaccineRequest):
     """
     Sugere vacinas recomendadas baseado na espécie, raça e idade do pet usando IA.
+    As respostas são cacheadas por espécie/raça/faixa etária normalizadas.
     """
-    try:
-        client = get_openai_client()
-        
+    species, breed, age = normalize_vaccine_request(request)
+
+    async def ask_model():
         # Construir prompt para sugestão de vacinas
-        prompt = f"""Como veterinário especializado, liste as vacinas essenciais e recomendadas para um {request.pet_species}"""
+        species_text = species if species in SPECIES_ALIASES.values() else request.pet_species.strip()
+        prompt = f"""Como veterinário especializado, liste as vacinas essenciais e recomendadas para um {species_text}"""
         
-        if request.pet_breed:
-            prompt += f" da raça {request.pet_breed}"
+        if breed == "srd":
+            if request.pet_breed:
+                prompt += " sem raça definida"
+        else:
+            prompt += f" da raça {request.pet_breed.strip()}"
         
-        if request.pet_age:
-            prompt += f" com {request.pet_age} de idade"
+        if age:
+            prompt += f" na faixa etária {age}"
         
         prompt += """.
 
@@ -206,7 +313,7 @@ Por favor, retorne uma lista de vacinas no seguinte formato JSON (sem explicaç
 
 Inclua apenas as vacinas mais importantes (máximo 8 vacinas). Seja conciso nas descrições."""
 
-        response = client.chat.completions.create(
+        response = await chat_completion(
             model="gpt-4o-mini",
             messages=[
                 {
@@ -224,22 +331,21 @@ Inclua apenas as vacinas mais importantes (máximo 8 vacinas). Seja conciso nas
         
         ai_response = response.choices[0].message.content
         
-        # Tentar extrair JSON da resposta
-        import json
-        import re
-        
-        # Remover possíveis code blocks
+        # Tentar extrair JSON da resposta (removendo possíveis code blocks)
         json_match = re.search(r'\[.*\]', ai_response, re.DOTALL)
         if json_match:
-            vaccines_data = json.loads(json_match.group())
-        else:
-            vaccines_data = json.loads(ai_response)
-        
+            return json.loads(json_match.group())
+        return json.loads(ai_response)
+
+    try:
+        vaccines_data = await vaccine_cache.get_or_compute(f"vaccines:{species}|{breed}|{age or ''}", ask_model)
         return {
             "success": True,
             "vaccines": vaccines_data
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=500,
@@ -1,23 +1,26 @@
-from fastapi import APIRouter, Depends, HTTPException
-from fastapi.security import OAuth2PasswordBearer
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from typing import List, Optional
+from datetime import datetime
+import base64
+import csv
+import io
+import json
 from bson import ObjectId
-from app.models.schemas import DiaryEntryIn, DiaryEntryOut
-from app.core.db import get_db
+from pydantic import TypeAdapter, ValidationError
+from pymongo import ASCENDING, DESCENDING
+from pymongo.errors import BulkWriteError
+from app.models.schemas import DiaryEntryIn, DiaryEntryOut, DiaryBulkItem, DiaryBulkOut
+from app.core.db import get_db, stored_datetime
+from app.core.auth import Principal, get_current_user
 from app.core.config import get_settings
-from jose import jwt, JWTError
+from app.core.fastjson import fast_json
+from app.core.pet_stats import record_entries
+from app.core.render_cache import public_cards
 
 router = APIRouter(prefix="/diary", tags=["diary"])
-oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 settings = get_settings()
 
-def get_user_id_from_token(token: str) -> str:
-    try:
-        payload = jwt.decode(token, settings.JWT_SECRET, algorithms=[settings.JWT_ALG])
-        return payload.get("sub")
-    except JWTError:
-        raise HTTPException(status_code=401, detail="Token inválido")
-
 def normalize_entry(doc) -> DiaryEntryOut:
     return {
         "id": str(doc["_id"]),
@@ -31,22 +34,284 @@ def normalize_entry(doc) -> DiaryEntryOut:
     }
 
 @router.post("", response_model=DiaryEntryOut)
-async def add_entry(payload: DiaryEntryIn, token: str = Depends(oauth2_scheme)):
+async def add_entry(payload: DiaryEntryIn, user: Principal = Depends(get_current_user)):
     db = get_db()
-    _ = get_user_id_from_token(token)
     doc = payload.dict()
     doc["pet_id"] = ObjectId(payload.pet_id) if ObjectId.is_valid(payload.pet_id) else payload.pet_id
+    # Grava e devolve a data como o MongoDB a armazena, para a resposta bater com a leitura
+    doc["date"] = stored_datetime(payload.date)
     res = await db.diary.insert_one(doc)
-    created = await db.diary.find_one({"_id": res.inserted_id})
-    return normalize_entry(created)
+    await record_entries([doc], db)
+    public_cards.invalidate(str(payload.pet_id))
+    return normalize_entry({**doc, "_id": res.inserted_id})
+
+BULK_BODY = {
+    "requestBody": {
+        "required": True,
+        "content": {
+            "application/json": {"schema": {"type": "array", "items": {"$ref": "#/components/schemas/DiaryEntryIn"}}},
+            "application/x-ndjson": {"schema": {"type": "string", "description": "Uma entrada JSON por linha"}},
+        },
+    }
+}
+entries_adapter = TypeAdapter(List[DiaryEntryIn])
+
+async def read_bulk_items(request: Request) -> list:
+    """Lê o corpo como array JSON ou NDJSON (uma entrada por linha), com limites de tamanho."""
+    max_bytes, max_items = settings.DIARY_BULK_MAX_BYTES, settings.DIARY_BULK_MAX_ITEMS
+    body = bytearray()
+    async for chunk in request.stream():
+        body += chunk
+        if len(body) > max_bytes:
+            raise HTTPException(status_code=413, detail=f"Corpo maior que o limite de {max_bytes // (1024 * 1024)} MB")
+    content_type = request.headers.get("content-type", "")
+    if "ndjson" in content_type or "jsonl" in content_type:
+        items = []
+        for line in bytes(body).splitlines():
+            if not line.strip():
+                continue
+            try:
+                items.append(json.loads(line))
+            except ValueError:
+                items.append(None)  # vira erro no resultado desta posição
+    else:
+        try:
+            items = json.loads(body)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="JSON inválido")
+        if not isinstance(items, list):
+            raise HTTPException(status_code=400, detail="Envie um array de entradas ou NDJSON")
+    if len(items) > max_items:
+        raise HTTPException(status_code=413, detail=f"Máximo de {max_items} entradas por requisição")
+    return items
+
+def validate_chunk(items: list) -> list:
+    """Valida um lote de uma vez; se falhar, valida item a item para isolar os erros."""
+    try:
+        return entries_adapter.validate_python(items)
+    except ValidationError:
+        pass
+    validated = []
+    for item in items:
+        try:
+            validated.append(DiaryEntryIn.model_validate(item))
+        except ValidationError as e:
+            err = e.errors()[0]
+            validated.append(f"{'.'.join(str(p) for p in err['loc']) or 'entrada'}: {err['msg']}")
+    return validated
+
+@router.post("/bulk", response_model=DiaryBulkOut, openapi_extra=BULK_BODY)
+async def add_entries_bulk(request: Request, ordered: bool = False, user: Principal = Depends(get_current_user)):
+    """Insere várias entradas de uma vez (array JSON ou NDJSON) e devolve o resultado de cada uma.
+
+    Com `ordered=false` (padrão) os erros não interrompem as demais entradas;
+    com `ordered=true` o processamento para no primeiro erro (de validação ou de
+    gravação) e o resto vem como "skipped". `failed` e `skipped` contam cada caso.
+    """
+    db = get_db()
+    items = await read_bulk_items(request)
+    chunk_size = max(1, settings.DIARY_BULK_CHUNK_SIZE)
+    results: list[DiaryBulkItem | None] = [None] * len(items)  # None no fim = "skipped"
+    docs: list[tuple[int, dict]] = []
+    owned: set[str] = set()
+    checked: set[str] = set()
+    stop = False
+    for start in range(0, len(items), chunk_size):
+        chunk = validate_chunk(items[start:start + chunk_size])
+        # Dono verificado uma vez por pet: uma consulta por lote com pets ainda não vistos
+        new_pets = {e.pet_id for e in chunk if not isinstance(e, str)} - checked
+        valid = [ObjectId(p) for p in new_pets if ObjectId.is_valid(p)]
+        if valid:
+            cursor = db.pets.find({"_id": {"$in": valid}, "owner_id": ObjectId(user.user_id)}, {"_id": 1})
+            owned |= {str(p["_id"]) async for p in cursor}
+        checked |= new_pets
+        for offset, entry in enumerate(chunk):
+            index = start + offset
+            if isinstance(entry, str):
+                error = entry
+            elif entry.pet_id not in owned:
+                error = "Pet não encontrado"
+            else:
+                doc = {**entry.model_dump(), "pet_id": ObjectId(entry.pet_id), "date": stored_datetime(entry.date)}
+                docs.append((index, doc))
+                continue
+            results[index] = DiaryBulkItem(index=index, status="error", error=error)
+            if ordered:
+                # modo ordenado: nada depois do primeiro erro é gravado nem avaliado
+                stop = True
+                break
+        if stop:
+            break
+
+    inserted = 0
+    for start in range(0, len(docs), chunk_size):
+        chunk = docs[start:start + chunk_size]
+        failed: dict[int, str] = {}
+        created: list[dict] = []
+        try:
+            await db.diary.insert_many([doc for _, doc in chunk], ordered=ordered)
+        except BulkWriteError as e:
+            failed = {err["index"]: err.get("errmsg", "Erro ao gravar") for err in e.details.get("writeErrors", [])}
+        for position, (index, doc) in enumerate(chunk):
+            if position in failed:
+                results[index] = DiaryBulkItem(index=index, status="error", error=failed[position])
+            elif ordered and failed and position > min(failed):
+                break
+            else:
+                results[index] = DiaryBulkItem(index=index, status="created", id=str(doc["_id"]))
+                created.append(doc)
+        # Resumo e cards atualizados a cada lote gravado: se um lote seguinte
+        # falhar, o que já está no diário não fica de fora do resumo
+        if created:
+            inserted += len(created)
+            await record_entries(created, db)
+            for pet_id in {str(doc["pet_id"]) for doc in created}:
+                public_cards.invalidate(pet_id)
+        if ordered and failed:
+            break
+
+    results = [r or DiaryBulkItem(index=i, status="skipped") for i, r in enumerate(results)]
+    return DiaryBulkOut(
+        inserted=inserted,
+        failed=sum(r.status == "error" for r in results),
+        skipped=sum(r.status == "skipped" for r in results),
+        results=results,
+    )
+
+def encode_cursor(doc) -> str:
+    raw = f"{doc['date'].isoformat()}|{doc['_id']}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> tuple[datetime, ObjectId]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        date_str, oid = raw.split("|", 1)
+        return datetime.fromisoformat(date_str), ObjectId(oid)
+    except Exception:
+        raise HTTPException(status_code=400, detail="Cursor inválido")
+
+def pet_filter(pet_id: str) -> dict:
+    return {"pet_id": ObjectId(pet_id)} if ObjectId.is_valid(pet_id) else {"pet_id": pet_id}
 
 @router.get("/{pet_id}", response_model=List[DiaryEntryOut])
-async def get_entries(pet_id: str, token: str = Depends(oauth2_scheme)):
+async def get_entries(
+    pet_id: str,
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=settings.DIARY_PAGE_MAX),
+    after: Optional[str] = None,
+    before: Optional[str] = None,
+    date_from: Optional[datetime] = Query(None, alias="from"),
+    date_to: Optional[datetime] = Query(None, alias="to"),
+    user: Principal = Depends(get_current_user),
+):
+    """Lista as entradas em ordem cronológica, paginadas por cursor em (date, _id).
+
+    O cursor da próxima/anterior página vem nos headers X-Next-Cursor e X-Prev-Cursor.
+    Sem `limit`, `after` nem `before` a resposta traz todas as entradas, sem
+    cursores, como antes da paginação (clientes antigos do app dependem disso).
+    """
+    if after and before:
+        raise HTTPException(status_code=400, detail="Use apenas um dos cursores: after ou before")
+    paged = limit is not None or after is not None or before is not None
+    db = get_db()
+    clauses = [pet_filter(pet_id)]
+    date_range = {}
+    if date_from:
+        date_range["$gte"] = date_from
+    if date_to:
+        date_range["$lte"] = date_to
+    if date_range:
+        clauses.append({"date": date_range})
+
+    backwards = before is not None
+    if after or before:
+        date, oid = decode_cursor(after or before)
+        op = "$lt" if backwards else "$gt"
+        clauses.append({"$or": [{"date": {op: date}}, {"date": date, "_id": {op: oid}}]})
+
+    direction = DESCENDING if backwards else ASCENDING
+    cursor = db.diary.find({"$and": clauses} if len(clauses) > 1 else clauses[0])
+    cursor = cursor.sort([("date", direction), ("_id", direction)])
+    if not paged:
+        docs = await cursor.to_list(length=None)
+        items = [normalize_entry(d) for d in docs]
+        return fast_json(items, List[DiaryEntryOut]) if settings.JSON_FAST_PATH else items
+
+    limit = limit or settings.DIARY_PAGE_SIZE
+    cursor = cursor.limit(limit + 1)
+    docs = await cursor.to_list(length=limit + 1)
+    has_more = len(docs) > limit
+    docs = docs[:limit]
+    if backwards:
+        docs.reverse()
+
+    # Ao paginar para trás sempre existe página seguinte (a de onde viemos), e vice-versa
+    more_after = True if backwards else has_more
+    more_before = has_more if backwards else after is not None
+    headers = {}
+    if docs and more_after:
+        headers["X-Next-Cursor"] = encode_cursor(docs[-1])
+    if docs and more_before:
+        headers["X-Prev-Cursor"] = encode_cursor(docs[0])
+    items = [normalize_entry(d) for d in docs]
+    if settings.JSON_FAST_PATH:
+        return fast_json(items, List[DiaryEntryOut], headers=headers)
+    response.headers.update(headers)
+    return items
+
+EXPORT_FIELDS = {"date": 1, "appetite": 1, "energy": 1, "medication": 1, "notes": 1, "symptom_photo": 1}
+EXPORT_COLUMNS = ["id", "date", "appetite", "energy", "medication", "notes", "symptom_photo"]
+EXPORT_FORMATS = {"ndjson": "application/x-ndjson", "csv": "text/csv; charset=utf-8"}
+
+def export_row(doc) -> dict:
+    date = doc.get("date")
+    return {
+        "id": str(doc["_id"]),
+        "date": date.isoformat() if isinstance(date, datetime) else date,
+        "appetite": doc.get("appetite"),
+        "energy": doc.get("energy"),
+        "medication": doc.get("medication", False),
+        "notes": doc.get("notes"),
+        "symptom_photo": doc.get("symptom_photo"),
+    }
+
+async def export_lines(cursor, fmt: str, batch_size: int):
+    """Converte o cursor em blocos de texto, um por lote lido do banco."""
+    if fmt == "csv":
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=EXPORT_COLUMNS)
+        writer.writeheader()
+        yield buffer.getvalue()
+    try:
+        while batch := await cursor.to_list(length=batch_size):
+            if fmt == "csv":
+                buffer.seek(0)
+                buffer.truncate()
+                writer.writerows(export_row(d) for d in batch)
+                yield buffer.getvalue()
+            else:
+                yield "".join(json.dumps(export_row(d), ensure_ascii=False) + "\n" for d in batch)
+    finally:
+        await cursor.close()  # cliente desconectou no meio: libera o cursor no servidor
+
+@router.get("/{pet_id}/export")
+async def export_entries(
+    pet_id: str,
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+    user: Principal = Depends(get_current_user),
+):
+    """Exporta o diário completo do pet em NDJSON ou CSV, transmitido direto do cursor."""
     db = get_db()
-    _ = get_user_id_from_token(token)
-    q = {"pet_id": ObjectId(pet_id)} if ObjectId.is_valid(pet_id) else {"pet_id": pet_id}
-    cursor = db.diary.find(q).sort("date", 1)
-    items = []
-    async for d in cursor:
-        items.append(normalize_entry(d))
-    return items
\ No newline at end of file
+    owned = ObjectId.is_valid(pet_id) and await db.pets.find_one(
+        {"_id": ObjectId(pet_id), "owner_id": ObjectId(user.user_id)}, {"_id": 1}
+    )
+    if not owned:
+        raise HTTPException(status_code=404, detail="Pet não encontrado")
+    batch_size = settings.DIARY_EXPORT_BATCH_SIZE
+    cursor = db.diary.find(pet_filter(pet_id), EXPORT_FIELDS)
+    cursor = cursor.sort([("date", ASCENDING), ("_id", ASCENDING)]).batch_size(batch_size)
+    return StreamingResponse(
+        export_lines(cursor, format, batch_size),
+        media_type=EXPORT_FORMATS[format],
+        headers={"Content-Disposition": f'attachment; filename="diario_{pet_id}.{format}"'},
+    )
@@ -1,32 +1,28 @@
 from fastapi import APIRouter, Depends, HTTPException
-from fastapi.security import OAuth2PasswordBearer
-from jose import jwt, JWTError
 from bson import ObjectId
+from pymongo import ReturnDocument
 from typing import List
 from app.models.schemas import PetIn, PetOut, VaccineData
 from app.core.db import get_db
+from app.core.auth import Principal, get_current_user
 from app.core.config import get_settings
+from app.core.fastjson import fast_json
+from app.core.render_cache import public_cards
 
 router = APIRouter(prefix="/pets", tags=["pets"])
-oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 settings = get_settings()
 
-def get_user_id_from_token(token: str) -> str:
-    try:
-        payload = jwt.decode(token, settings.JWT_SECRET, algorithms=[settings.JWT_ALG])
-        return payload.get("sub")
-    except JWTError:
-        raise HTTPException(status_code=401, detail="Token inválido")
+def normalize_vaccine(vaccine: dict) -> dict:
+    # Só os campos de VaccineData: o caminho rápido (fast_json) não passa pelo response_model
+    normalized = {name: vaccine[name] for name in VaccineData.model_fields if name in vaccine}
+    normalized.setdefault("applied", False)
+    if normalized.get("id") is not None:
+        normalized["id"] = str(normalized["id"])
+    return normalized
 
 def normalize_pet(doc) -> PetOut:
-    # Normalizar vacinas - converter id para string se necessário
-    vaccines = doc.get("vaccines", [])
-    normalized_vaccines = []
-    for vaccine in vaccines:
-        if vaccine.get("id") is not None:
-            vaccine["id"] = str(vaccine["id"])
-        normalized_vaccines.append(vaccine)
-    
+    normalized_vaccines = [normalize_vaccine(v) for v in doc.get("vaccines") or []]
+
     return {
         "id": str(doc["_id"]),
         "name": doc["name"],
@@ -42,51 +38,51 @@ def normalize_pet(doc) -> PetOut:
     }
 
 @router.post("", response_model=PetOut)
-async def create_pet(payload: PetIn, token: str = Depends(oauth2_scheme)):
+async def create_pet(payload: PetIn, user: Principal = Depends(get_current_user)):
     db = get_db()
-    user_id = get_user_id_from_token(token)
+    user_id = user.user_id
     doc = {**payload.dict(), "owner_id": ObjectId(user_id)}
     res = await db.pets.insert_one(doc)
-    created = await db.pets.find_one({"_id": res.inserted_id})
-    return normalize_pet(created)
+    return normalize_pet({**doc, "_id": res.inserted_id})
 
 @router.get("", response_model=List[PetOut])
-async def list_pets(token: str = Depends(oauth2_scheme)):
+async def list_pets(user: Principal = Depends(get_current_user)):
     db = get_db()
-    user_id = get_user_id_from_token(token)
+    user_id = user.user_id
     cursor = db.pets.find({"owner_id": ObjectId(user_id)})
     items = []
     async for d in cursor:
         items.append(normalize_pet(d))
+    if settings.JSON_FAST_PATH:
+        return fast_json(items, List[PetOut])
     return items
 
+def owned_pet(pet_id: str, user_id: str) -> dict:
+    """Filtro que só casa com o pet se ele pertencer ao usuário."""
+    if not ObjectId.is_valid(pet_id):
+        raise HTTPException(status_code=404, detail="Pet não encontrado")
+    return {"_id": ObjectId(pet_id), "owner_id": ObjectId(user_id)}
+
 @router.put("/{pet_id}/vaccines")
 async def update_pet_vaccines(
     pet_id: str, 
     vaccines: List[dict], 
-    token: str = Depends(oauth2_scheme)
+    user: Principal = Depends(get_current_user)
 ):
     """Atualiza a lista completa de vacinas do pet"""
     db = get_db()
-    user_id = get_user_id_from_token(token)
+    user_id = user.user_id
     
-    # Verificar se o pet pertence ao usuário
-    pet = await db.pets.find_one({
-        "_id": ObjectId(pet_id),
-        "owner_id": ObjectId(user_id)
-    })
+    # Dono no filtro: verificação e escrita numa única operação atômica
+    updated = await db.pets.find_one_and_update(
+        owned_pet(pet_id, user_id),
+        {"$set": {"vaccines": vaccines}},
+        return_document=ReturnDocument.AFTER,
+    )
     
-    if not pet:
+    if not updated:
         raise HTTPException(status_code=404, detail="Pet não encontrado")
     
-    # Atualizar vacinas (já em formato dict)
-    await db.pets.update_one(
-        {"_id": ObjectId(pet_id)},
-        {"$set": {"vaccines": vaccines}}
-    )
-    
-    # Retornar pet atualizado
-    updated = await db.pets.find_one({"_id": ObjectId(pet_id)})
     return normalize_pet(updated)
 
 @router.patch("/{pet_id}/vaccines/{vaccine_id}")
@@ -94,55 +90,39 @@ async def toggle_vaccine_applied(
     pet_id: str,
     vaccine_id: str,
     applied: bool,
-    token: str = Depends(oauth2_scheme)
+    user: Principal = Depends(get_current_user)
 ):
     """Marca ou desmarca uma vacina específica como aplicada"""
     db = get_db()
-    user_id = get_user_id_from_token(token)
+    user_id = user.user_id
     
-    # Verificar se o pet pertence ao usuário
-    pet = await db.pets.find_one({
-        "_id": ObjectId(pet_id),
-        "owner_id": ObjectId(user_id)
-    })
-    
-    if not pet:
-        raise HTTPException(status_code=404, detail="Pet não encontrado")
-    
-    # Atualizar o status da vacina específica
-    vaccines = pet.get("vaccines", [])
-    for vaccine in vaccines:
-        if vaccine.get("id") == vaccine_id:
-            vaccine["applied"] = applied
-            break
-    
-    await db.pets.update_one(
-        {"_id": ObjectId(pet_id)},
-        {"$set": {"vaccines": vaccines}}
+    # Altera só o campo da vacina no servidor: toggles simultâneos não se sobrescrevem.
+    # "vaccines.id" no filtro: pets sem a lista ou sem essa vacina não casam (404).
+    updated = await db.pets.find_one_and_update(
+        {**owned_pet(pet_id, user_id), "vaccines.id": vaccine_id},
+        {"$set": {"vaccines.$[v].applied": applied}},
+        array_filters=[{"v.id": vaccine_id}],
+        return_document=ReturnDocument.AFTER,
     )
     
-    updated = await db.pets.find_one({"_id": ObjectId(pet_id)})
+    if not updated:
+        raise HTTPException(status_code=404, detail="Pet ou vacina não encontrado")
+    
     return normalize_pet(updated)
 
 @router.delete("/{pet_id}")
 async def delete_pet(
     pet_id: str,
-    token: str = Depends(oauth2_scheme)
+    user: Principal = Depends(get_current_user)
 ):
     """Remove um pet do usuário"""
     db = get_db()
-    user_id = get_user_id_from_token(token)
+    user_id = user.user_id
     
-    # Verificar se o pet pertence ao usuário
-    pet = await db.pets.find_one({
-        "_id": ObjectId(pet_id),
-        "owner_id": ObjectId(user_id)
-    })
+    res = await db.pets.delete_one(owned_pet(pet_id, user_id))
     
-    if not pet:
+    if not res.deleted_count:
         raise HTTPException(status_code=404, detail="Pet não encontrado")
-    
-    # Deletar o pet
-    await db.pets.delete_one({"_id": ObjectId(pet_id)})
+    public_cards.invalidate(pet_id)
     
     return {"success": True, "message": "Pet removido com sucesso"}
\ No newline at end of file
@@ -1,9 +1,15 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Request, Response
 from fastapi.responses import HTMLResponse
+from datetime import datetime
 from bson import ObjectId
 from app.core.db import get_db
+from app.core.config import get_settings
+from app.core.render_cache import public_cards
+from app.core.pet_stats import get_pet_stats, daily_scores
+from app.core.series import downsample
 
 router = APIRouter(prefix="/public", tags=["public"])
+settings = get_settings()
 
 HTML_TEMPLATE = """<!DOCTYPE html>
 <html lang="pt-BR">
@@ -71,38 +77,42 @@ HTML_TEMPLATE = """<!DOCTYPE html>
 </body>
 </html>"""
 
-def score(v: str) -> int:
-    if v == "high": return 3
-    if v == "mid": return 2
-    if v == "low": return 1
-    return 0
+CARD_PET_FIELDS = {"name": 1, "species": 1, "breed": 1, "age": 1, "weight": 1, "allergies": 1}
 
-@router.get("/pet/{pet_id}", response_class=HTMLResponse)
-async def public_pet_card(pet_id: str):
+async def card_stamp(pet_id: str):
+    """Versão barata da carteirinha: campos exibidos do pet + contagem/último _id do resumo."""
+    db = get_db()
+    pet = None
+    if ObjectId.is_valid(pet_id):
+        pet = await db.pets.find_one({"_id": ObjectId(pet_id)}, CARD_PET_FIELDS)
+    pet_key = ObjectId(pet_id) if ObjectId.is_valid(pet_id) else pet_id
+    stats = await db.pet_stats.find_one({"_id": pet_key}, {"count": 1, "last_id": 1}) or {}
+    return repr(sorted(pet.items())) if pet else None, stats.get("count", 0), stats.get("last_id")
+
+async def render_card(pet_id: str) -> str:
     db = get_db()
     pet = None
     if ObjectId.is_valid(pet_id):
         pet = await db.pets.find_one({"_id": ObjectId(pet_id)})
-    # Load diary
     q = {"pet_id": ObjectId(pet_id)} if ObjectId.is_valid(pet_id) else {"pet_id": pet_id}
-    entries = []
-    cursor = db.diary.find(q).sort("date", 1)
-    async for d in cursor:
-        entries.append(d)
+    stats = await get_pet_stats(q["pet_id"])
+    entries_count = stats.get("count", 0)
 
     if not pet:
         html = HTML_TEMPLATE.format(
             name="Pet", species="—", breed="—", age="—", weight="—", allergies="—",
-            pet_id=pet_id, entries_count=len(entries),
+            pet_id=pet_id, entries_count=entries_count,
             period_text="—",
             labels_json="[]", values_json="[]",
             timeline_html="<li>Nenhum registro encontrado.</li>",
             pdf_url=f"/api/reports/diary/{pet_id}"
         )
-        return HTMLResponse(content=html)
+        return html
 
-    # build chart + timeline
-    labels, values, timeline = [], [], []
+    # timeline: só as últimas entradas exibidas
+    cursor = db.diary.find(q).sort([("date", -1), ("_id", -1)]).limit(settings.PUBLIC_CARD_TIMELINE_SIZE)
+    entries = [d async for d in cursor][::-1]
+    timeline = []
     for e in entries:
         dt = e.get("date")
         try:
@@ -111,21 +121,22 @@ async def public_pet_card(pet_id: str):
             dt_str = str(dt)
         ap, en = e.get("appetite","?"), e.get("energy","?")
         med = "Sim" if e.get("medication") else "Não"
-        labels.append(dt_str)
-        values.append((score(ap)+score(en))/2 if isinstance(ap, str) and isinstance(en, str) else 0)
         notes = e.get("notes") or ""
         notes_html = f"<div style='color:#6b7280'>Obs: {notes}</div>" if notes else ""
         timeline.append(f"<li><b>{dt_str}</b> — Apetite: {ap} • Energia: {en} • Medicação: {med}{notes_html}</li>")
 
-    if entries:
-        first, last = entries[0].get("date"), entries[-1].get("date")
-        try:
-            period_text = f"{first.strftime('%d/%m/%Y')} – {last.strftime('%d/%m/%Y')}"
-        except Exception:
-            period_text = "—"
+    first, last = stats.get("first_date"), stats.get("last_date")
+    if isinstance(first, datetime) and isinstance(last, datetime):
+        period_text = f"{first.strftime('%d/%m/%Y')} – {last.strftime('%d/%m/%Y')}"
     else:
         period_text = "—"
 
+    # gráfico: médias por dia/semana reduzidas a um número fixo de pontos
+    labels, values = [], []
+    for dt, value in downsample(daily_scores(stats), settings.PUBLIC_CARD_CHART_POINTS):
+        labels.append(dt.strftime("%d/%m/%Y"))
+        values.append(round(value, 2))
+
     html = HTML_TEMPLATE.format(
         name=pet.get("name","—"),
         species=pet.get("species","—"),
@@ -134,11 +145,23 @@ async def public_pet_card(pet_id: str):
         weight=str(pet.get("weight","—")) if pet.get("weight") else "—",
         allergies=pet.get("allergies") if pet.get("allergies") and pet.get("allergies") != "None" else "Nenhuma",
         pet_id=str(pet.get("_id")),
-        entries_count=len(entries),
+        entries_count=entries_count,
         period_text=period_text,
         labels_json=str(labels).replace("'", '"'),
         values_json=str(values),
-        timeline_html="".join(timeline[-30:]) if timeline else "<li>Nenhum registro encontrado.</li>",
+        timeline_html="".join(timeline) if timeline else "<li>Nenhum registro encontrado.</li>",
         pdf_url=f"/api/reports/diary/{pet_id}",
     )
-    return HTMLResponse(content=html)
\ No newline at end of file
+    return html
+
+@router.get("/pet/{pet_id}", response_class=HTMLResponse)
+async def public_pet_card(pet_id: str, request: Request):
+    card = await public_cards.get(pet_id, lambda: card_stamp(pet_id), lambda: render_card(pet_id))
+    headers = {
+        "ETag": card.etag,
+        "Cache-Control": f"public, max-age={int(public_cards.fresh_seconds)}, "
+                         f"stale-while-revalidate={int(public_cards.stale_seconds)}",
+    }
+    if card.etag in request.headers.get("if-none-match", ""):
+        return Response(status_code=304, headers=headers)
+    return HTMLResponse(content=card.body, headers=headers)
\ No newline at end of file
@@ -1,73 +1,65 @@
-from fastapi import APIRouter, Depends, HTTPException
-from fastapi.security import OAuth2PasswordBearer
-from fastapi.responses import StreamingResponse
-from io import BytesIO
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from fastapi.responses import FileResponse
+from fastapi.concurrency import run_in_threadpool
 from datetime import datetime
 from bson import ObjectId
-from reportlab.lib.pagesizes import A4
-from reportlab.pdfgen import canvas
-from reportlab.lib.units import cm
+import os
 from app.core.db import get_db
+from app.core.auth import Principal, get_current_user
 from app.core.config import get_settings
-from jose import jwt, JWTError
+from app.core.pdf import render_diary_pdf
+from app.core.pet_stats import get_pet_stats, averages
+from app.core.pool import ProcessPool
+from app.core.report_cache import ReportCache
 
 router = APIRouter(prefix="/reports", tags=["reports"])
-oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 settings = get_settings()
+renderer = ProcessPool(workers=settings.REPORT_WORKERS)
+report_cache = ReportCache(settings.REPORT_CACHE_DIR, settings.REPORT_CACHE_MAX_BYTES)
 
-def get_user_id_from_token(token: str) -> str:
-    try:
-        payload = jwt.decode(token, settings.JWT_SECRET, algorithms=[settings.JWT_ALG])
-        return payload.get("sub")
-    except JWTError:
-        raise HTTPException(status_code=401, detail="Token inválido")
+REPORT_FIELDS = {"_id": 0, "date": 1, "appetite": 1, "energy": 1, "medication": 1, "notes": 1}
 
 @router.get("/diary/{pet_id}")
-async def diary_report(pet_id: str, token: str = Depends(oauth2_scheme)):
+async def diary_report(pet_id: str, request: Request, user: Principal = Depends(get_current_user)):
     db = get_db()
-    _ = get_user_id_from_token(token)
     q = {"pet_id": ObjectId(pet_id)} if ObjectId.is_valid(pet_id) else {"pet_id": pet_id}
-    pet = await db.pets.find_one({"_id": ObjectId(pet_id)}) if ObjectId.is_valid(pet_id) else None
-    entries = []
-    cursor = db.diary.find(q).sort("date", 1)
-    async for d in cursor:
-        entries.append(d)
-    if not entries:
+    pet = await db.pets.find_one({"_id": ObjectId(pet_id)}, {"name": 1}) if ObjectId.is_valid(pet_id) else None
+    stats = await get_pet_stats(q["pet_id"])
+    if not stats.get("count"):
         raise HTTPException(status_code=404, detail="Sem entradas de diário para este pet.")
 
-    buf = BytesIO()
-    c = canvas.Canvas(buf, pagesize=A4)
-    w, h = A4
+    pet_name = pet.get("name") if pet else "Pet"
+    key = ReportCache.make_key(pet_id, pet_name, stats["count"], stats.get("last_id"), stats.get("last_date"))
+    etag = f'"{key}"'
+    headers = {
+        "ETag": etag,
+        "Cache-Control": "private, no-cache",
+        "Content-Disposition": f'inline; filename="relatorio_diario_{pet_id}.pdf"',
+    }
+    if etag in request.headers.get("if-none-match", ""):
+        return Response(status_code=304, headers={"ETag": etag, "Cache-Control": headers["Cache-Control"]})
 
-    title = f"Relatório de Recuperação - {pet.get('name') if pet else 'Pet'}"
-    c.setFont("Helvetica-Bold", 16)
-    c.drawString(2*cm, h-2*cm, title)
-    c.setFont("Helvetica", 10)
-    c.drawString(2*cm, h-2.6*cm, f"Gerado em: {datetime.utcnow().strftime('%d/%m/%Y %H:%M UTC')}")
-    c.line(2*cm, h-2.8*cm, w-2*cm, h-2.8*cm)
+    path = await run_in_threadpool(report_cache.get, key)
+    if path is None:
+        entries = []
+        cursor = db.diary.find(q, REPORT_FIELDS).sort("date", 1)
+        async for d in cursor:
+            entries.append(d)
 
-    y = h-3.5*cm
-    c.setFont("Helvetica-Bold", 12)
-    c.drawString(2*cm, y, "Entradas:")
-    y -= 0.5*cm
-    c.setFont("Helvetica", 10)
-    for e in entries:
+        # O PDF é desenhado em outro processo direto para um arquivo temporário
+        # no diretório do cache, depois movido para o nome final (atômico).
+        tmp_path = await run_in_threadpool(report_cache.temp_path)
         try:
-            dt = e["date"].strftime("%d/%m/%Y %H:%M")
-        except Exception:
-            dt = str(e["date"])
-        line = f"- {dt} | Apetite: {e.get('appetite','?')} | Energia: {e.get('energy','?')} | Medicação: {'Sim' if e.get('medication') else 'Não'}"
-        if y < 3*cm:
-            c.showPage(); y = h-2*cm
-        c.drawString(2*cm, y, line); y -= 0.5*cm
-        notes = e.get("notes")
-        if notes:
-            for i in range(0, len(notes), 90):
-                chunk = notes[i:i+90]
-                if y < 3*cm: c.showPage(); y = h-2*cm
-                c.drawString(3*cm, y, f"Obs: {chunk}"); y -= 0.5*cm
-
-    c.showPage(); c.save(); buf.seek(0)
-    return StreamingResponse(buf, media_type="application/pdf", headers={
-        "Content-Disposition": f'inline; filename="relatorio_diario_{pet_id}.pdf"'
-    })
\ No newline at end of file
+            summary = {
+                "count": stats["count"],
+                "first_date": stats.get("first_date"),
+                "last_date": stats.get("last_date"),
+                "averages": averages(stats),
+            }
+            await renderer.run(render_diary_pdf, tmp_path, pet_name, entries, datetime.utcnow(), summary)
+            path = await run_in_threadpool(report_cache.commit, tmp_path, key)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+    return FileResponse(path, media_type="application/pdf", headers=headers)
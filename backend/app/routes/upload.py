@@ -1,22 +1,45 @@
-from fastapi import APIRouter, UploadFile, File, Depends, HTTPException
-from fastapi.security import OAuth2PasswordBearer
+from fastapi import APIRouter, BackgroundTasks, Depends, Request
+from fastapi.concurrency import run_in_threadpool
 from pathlib import Path
-import uuid
+import logging
+import os
+from app.core.auth import Principal, get_current_user
+from app.core.blobs import register_upload
 from app.core.config import get_settings
+from app.core.images import RENDITIONS, parse_formats, render_derivatives
+from app.core.pool import ProcessPool
+from app.core.uploads import MULTIPART_FILE_BODY, receive_image
 
 router = APIRouter(prefix="/upload", tags=["upload"])
-oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 settings = get_settings()
+logger = logging.getLogger(__name__)
+image_pool = ProcessPool(workers=settings.IMAGE_WORKERS)
 
-@router.post("")
-async def upload_image(file: UploadFile = File(...), token: str = Depends(oauth2_scheme)):
-    suffix = Path(file.filename).suffix.lower()
-    if suffix not in [".jpg", ".jpeg", ".png", ".gif", ".webp"]:
-        raise HTTPException(status_code=400, detail="Formato não suportado")
-    uid = f"{uuid.uuid4().hex}{suffix}"
-    dest_dir = Path(settings.UPLOAD_DIR); dest_dir.mkdir(parents=True, exist_ok=True)
-    dest = dest_dir / uid
-    content = await file.read()
-    with open(dest, "wb") as f:
-        f.write(content)
-    return {"path": f"/static/{uid}"}
\ No newline at end of file
+async def generate_derivatives(path: str):
+    try:
+        await image_pool.run(
+            render_derivatives, path, settings.UPLOAD_DIR, parse_formats(settings.IMAGE_FORMATS), settings.IMAGE_QUALITY
+        )
+    except Exception as e:
+        # sem derivados, ?size= continua servindo o original
+        logger.warning("Falha ao gerar derivados de %s: %s", path, e)
+
+@router.post("", openapi_extra=MULTIPART_FILE_BODY)
+async def upload_image(request: Request, background_tasks: BackgroundTasks, user: Principal = Depends(get_current_user)):
+    dest_dir = Path(settings.UPLOAD_DIR)
+    tmp_path, suffix, digest = await receive_image(
+        request, dest_dir, max_bytes=settings.UPLOAD_MAX_BYTES, chunk_size=settings.UPLOAD_CHUNK_SIZE
+    )
+    # nome = hash do conteúdo: a mesma foto enviada de novo reaproveita o arquivo
+    name = f"{digest}{suffix}"
+    dest = dest_dir / name
+    size = os.path.getsize(tmp_path)
+    if await run_in_threadpool(dest.exists):
+        await run_in_threadpool(os.unlink, tmp_path)
+    else:
+        # rename atômico: o arquivo só aparece em /static depois de completo
+        await run_in_threadpool(os.replace, tmp_path, dest)
+        # miniaturas/WebP geradas depois da resposta; até lá ?size= serve o original
+        background_tasks.add_task(generate_derivatives, str(dest))
+    await register_upload(name, size)
+    return {"path": f"/static/{name}", "sizes": list(RENDITIONS)}
@@ -0,0 +1,20 @@
+import os
+import statistics
+
+# Os benchmarks importam `app.*`, que exige estas variáveis para montar o Settings.
+os.environ.setdefault("MONGO_URI", "mongodb://localhost:27017/")
+os.environ.setdefault("JWT_SECRET", "benchmark-secret-benchmark-secret-32")
+
+def percentile(samples: list[float], p: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    k = max(0, min(len(ordered) - 1, round(p / 100 * (len(ordered) - 1))))
+    return ordered[k]
+
+def summary(samples: list[float]) -> str:
+    ms = [s * 1000 for s in samples]
+    return (
+        f"n={len(ms)} p50={percentile(ms, 50):.1f}ms p95={percentile(ms, 95):.1f}ms "
+        f"p99={percentile(ms, 99):.1f}ms max={max(ms, default=0):.1f}ms mean={statistics.fmean(ms) if ms else 0:.1f}ms"
+    )
@@ -0,0 +1,87 @@
+"""Latência das demais rotas enquanto chamadas lentas ao LLM estão em andamento.
+
+Uso (a partir de backend/):
+    python -m benchmarks.bench_ai --calls 32 --concurrency 16 --latency 1
+
+Sobe um servidor OpenAI falso local (benchmarks.fake_openai) e dispara
+/api/ai-chat contra a API em processo, medindo ao mesmo tempo GET /api.
+O modo "sync" reproduz o cliente OpenAI síncrono antigo dentro do handler;
+o modo "async" usa o cliente compartilhado de app.core.llm.
+"""
+import argparse
+import asyncio
+import os
+import time
+
+from benchmarks._common import summary
+from benchmarks.fake_openai import FakeOpenAIServer
+
+CHAT_PAYLOAD = {"pet_name": "Rex", "pet_species": "cachorro", "messages": [], "new_message": "Ele está bem?"}
+
+async def run(mode: str, calls: int, concurrency: int, interval: float):
+    import httpx
+    from openai import OpenAI
+    from app.core import llm
+    from app.core.config import get_settings
+    from app.main import app
+    from app.routes import ai
+
+    settings = get_settings()
+    if mode == "sync":
+        def blocking_chat_completion(**kwargs):
+            return OpenAI(api_key=settings.OPENAI_API_KEY, base_url=settings.OPENAI_BASE_URL).chat.completions.create(**kwargs)
+
+        async def chat_completion(**kwargs):
+            return blocking_chat_completion(**kwargs)
+        ai.chat_completion = chat_completion
+    else:
+        ai.chat_completion = llm.chat_completion
+
+    ai_samples: list[float] = []
+    other_samples: list[float] = []
+    sem = asyncio.Semaphore(concurrency)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://petid") as client:
+        async def chat():
+            async with sem:
+                start = time.perf_counter()
+                r = await client.post("/api/ai-chat", json=CHAT_PAYLOAD)
+                r.raise_for_status()
+                ai_samples.append(time.perf_counter() - start)
+
+        async def probe(stop: asyncio.Event):
+            while not stop.is_set():
+                start = time.perf_counter()
+                await client.get("/api")
+                other_samples.append(time.perf_counter() - start)
+                await asyncio.sleep(interval)
+
+        stop = asyncio.Event()
+        probe_task = asyncio.create_task(probe(stop))
+        started = time.perf_counter()
+        await asyncio.gather(*(chat() for _ in range(calls)))
+        elapsed = time.perf_counter() - started
+        stop.set()
+        await probe_task
+    await llm.close_openai_client()
+
+    print(f"[{mode}] {calls} chamadas /ai-chat em {elapsed:.2f}s")
+    print(f"  /ai-chat: {summary(ai_samples)}")
+    print(f"  GET /api: {summary(other_samples)}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=32)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--latency", type=float, default=1.0, help="latência simulada do LLM (s)")
+    parser.add_argument("--probe-interval", type=float, default=0.01)
+    args = parser.parse_args()
+
+    with FakeOpenAIServer(latency=args.latency) as fake:
+        os.environ["OPENAI_API_KEY"] = "sk-fake"
+        os.environ["OPENAI_BASE_URL"] = fake.base_url
+        for mode in ("sync", "async"):
+            asyncio.run(run(mode, args.calls, args.concurrency, args.probe_interval))
+
+if __name__ == "__main__":
+    main()
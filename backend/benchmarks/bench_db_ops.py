@@ -0,0 +1,119 @@
+"""Operações no MongoDB por requisição nas rotas de escrita/leitura mais usadas.
+
+Uso (a partir de backend/, com um MongoDB acessível em MONGO_URI):
+    python -m benchmarks.bench_db_ops
+
+Conta os comandos enviados ao servidor (via monitoramento de comandos do
+PyMongo) durante cada requisição e falha (código 1) se alguma rota passar do
+orçamento em ROUTE_BUDGETS – por exemplo, um `find_one` logo depois do
+`insert_one` só para devolver o documento criado. Usa um banco descartável
+(`MONGO_DB`, padrão petid_bench_ops), removido no fim.
+"""
+import argparse
+import asyncio
+import os
+from collections import Counter
+
+from pymongo import monitoring
+
+from benchmarks import _common  # noqa: F401 – variáveis de ambiente padrão
+
+os.environ.setdefault("MONGO_DB", "petid_bench_ops")
+
+# comandos do próprio driver que não são round trips da rota
+IGNORED_COMMANDS = {"hello", "ismaster", "isMaster", "ping", "endSessions", "saslStart", "saslContinue"}
+
+# rota -> máximo de comandos por requisição
+ROUTE_BUDGETS = {
+    "POST /api/pets": 1,
+    "GET /api/pets": 1,
+    "PUT /api/pets/{id}/vaccines": 1,
+    "PATCH /api/pets/{id}/vaccines/{vaccine_id}": 1,
+    "POST /api/diary (1ª do pet)": 4,  # insert + resumo: update sem match, version, diário, insert
+    "POST /api/diary": 2,  # insert + $inc no resumo em pet_stats
+    "GET /api/diary/{id}": 1,
+    "DELETE /api/pets/{id}": 1,
+}
+
+VACCINE = {
+    "id": "v8", "name": "V8", "description": "Polivalente", "ageRecommendation": "6 semanas",
+    "frequency": "anual", "priority": "essential", "applied": False,
+}
+
+class CommandCounter(monitoring.CommandListener):
+    def __init__(self):
+        self.commands: Counter = Counter()
+
+    def started(self, event):
+        if event.command_name not in IGNORED_COMMANDS:
+            self.commands[event.command_name] += 1
+
+    def succeeded(self, event):
+        pass
+
+    def failed(self, event):
+        pass
+
+async def run(repeat: int) -> int:
+    import httpx
+    from motor.motor_asyncio import AsyncIOMotorClient
+    from app.core import db as db_module
+    from app.core.config import get_settings
+    from app.main import app
+
+    settings = get_settings()
+    counter = CommandCounter()
+    db_module._client = AsyncIOMotorClient(settings.MONGO_URI, event_listeners=[counter])
+    db_module._db = None
+
+    results: dict[str, list[Counter]] = {route: [] for route in ROUTE_BUDGETS}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://petid") as client:
+        async def measure(route: str, method: str, url: str, **kwargs):
+            counter.commands.clear()
+            r = await client.request(method, url, **kwargs)
+            r.raise_for_status()
+            results[route].append(Counter(counter.commands))
+            return r
+
+        await client.post("/api/auth/register", json={"email": "bench@example.com", "password": "x"})
+        login = await client.post("/api/auth/login", data={"username": "bench@example.com", "password": "x"})
+        login.raise_for_status()
+        token = login.json()["access_token"]
+        headers = {"Authorization": f"Bearer {token}"}
+
+        for i in range(repeat):
+            pet = (await measure("POST /api/pets", "POST", "/api/pets",
+                                 json={"name": f"Rex {i}", "species": "dog"}, headers=headers)).json()
+            pet_id = pet["id"]
+            await measure("GET /api/pets", "GET", "/api/pets", headers=headers)
+            await measure("PUT /api/pets/{id}/vaccines", "PUT", f"/api/pets/{pet_id}/vaccines",
+                          json=[VACCINE], headers=headers)
+            await measure("PATCH /api/pets/{id}/vaccines/{vaccine_id}", "PATCH",
+                          f"/api/pets/{pet_id}/vaccines/v8?applied=true", headers=headers)
+            entry = {"pet_id": pet_id, "date": "2024-01-01T10:00:00", "appetite": "high", "energy": "mid"}
+            await measure("POST /api/diary (1ª do pet)", "POST", "/api/diary", json=entry, headers=headers)
+            await measure("POST /api/diary", "POST", "/api/diary", json=entry, headers=headers)
+            await measure("GET /api/diary/{id}", "GET", f"/api/diary/{pet_id}", headers=headers)
+            await measure("DELETE /api/pets/{id}", "DELETE", f"/api/pets/{pet_id}", headers=headers)
+
+    await db_module._client.drop_database(settings.MONGO_DB)
+
+    over_budget = 0
+    for route, budget in ROUTE_BUDGETS.items():
+        worst = max(results[route], key=lambda c: sum(c.values()))
+        ops = sum(worst.values())
+        status = "ok" if ops <= budget else "ACIMA DO ORÇAMENTO"
+        detail = ", ".join(f"{name}={n}" for name, n in sorted(worst.items()))
+        print(f"{route:45} {ops} op(s) (máx. {budget}) {status}  [{detail}]")
+        over_budget += ops > budget
+    return 1 if over_budget else 0
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    raise SystemExit(asyncio.run(run(args.repeat)))
+
+if __name__ == "__main__":
+    main()
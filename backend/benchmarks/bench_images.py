@@ -0,0 +1,67 @@
+"""Bytes transferidos e tempo de decodificação por tela de lista de pets.
+
+Uso (a partir de backend/):
+    python -m benchmarks.bench_images --pets 20 --width 4032 --height 3024
+
+Gera fotos sintéticas do tamanho de uma câmera de celular, roda o pipeline de
+derivados (app.core.images) e compara, para uma tela com `--pets` avatares,
+o original contra cada tamanho/formato: bytes a baixar e tempo para
+decodificar as imagens no cliente.
+"""
+import argparse
+import io
+import tempfile
+import time
+from pathlib import Path
+
+from PIL import Image
+
+from app.core.images import RENDITIONS, derived_name, render_derivatives
+
+def synthetic_photo(path: Path, width: int, height: int, seed: int):
+    # ruído suavizado comprime como uma foto real (muito mais que cor sólida)
+    noise = Image.effect_noise((width // 8, height // 8), 40 + seed % 20).convert("RGB")
+    noise.resize((width, height), Image.Resampling.BICUBIC).save(path, "JPEG", quality=90)
+
+def decode_seconds(data: bytes) -> float:
+    start = time.perf_counter()
+    with Image.open(io.BytesIO(data)) as im:
+        im.load()
+    return time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pets", type=int, default=20)
+    parser.add_argument("--width", type=int, default=4032)
+    parser.add_argument("--height", type=int, default=3024)
+    parser.add_argument("--formats", default="webp,avif")
+    parser.add_argument("--quality", type=int, default=75)
+    args = parser.parse_args()
+    formats = [f for f in args.formats.split(",") if f]
+
+    with tempfile.TemporaryDirectory() as upload_dir:
+        sources = []
+        for i in range(args.pets):
+            src = Path(upload_dir) / f"pet{i}.jpg"
+            synthetic_photo(src, args.width, args.height, i)
+            sources.append(src)
+
+        start = time.perf_counter()
+        for src in sources:
+            render_derivatives(str(src), upload_dir, formats, args.quality)
+        print(f"pipeline: {(time.perf_counter() - start) / len(sources) * 1000:.0f} ms por foto ({', '.join(formats)})")
+
+        variants = {"original": [s.name for s in sources]}
+        for size in RENDITIONS:
+            for fmt in formats:
+                variants[f"{size}.{fmt}"] = [derived_name(s.name, size, fmt) for s in sources]
+
+        print(f"tela com {args.pets} pets:")
+        for label, names in variants.items():
+            blobs = [(Path(upload_dir) / n).read_bytes() for n in names]
+            total = sum(len(b) for b in blobs)
+            decode = sum(decode_seconds(b) for b in blobs)
+            print(f"  {label:14} {total / 1024:10.1f} KiB  decodificação {decode * 1000:8.1f} ms")
+
+if __name__ == "__main__":
+    main()
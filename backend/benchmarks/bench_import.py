@@ -0,0 +1,78 @@
+"""Tempo de importação de app.main (cold start de um worker).
+
+Uso (a partir de backend/):
+    python -m benchmarks.bench_import --runs 5 --budget-ms 1500
+
+Roda `python -X importtime -c "import app.main"` em processos novos e usa a
+mediana do tempo acumulado de app.main. Sai com 1 se:
+- a mediana passar de --budget-ms; ou
+- algum módulo de LAZY_MODULES for importado no startup (eles devem ser
+  carregados só sob demanda: OpenAI em app.core.llm, reportlab em app.core.pdf).
+
+Também lista os pacotes que mais pesam no startup (tempo próprio somado por
+pacote de topo).
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from collections import Counter
+from pathlib import Path
+
+from benchmarks import _common  # noqa: F401 – variáveis de ambiente padrão
+
+BACKEND = Path(__file__).resolve().parent.parent
+LAZY_MODULES = ["openai", "httpx", "reportlab"]
+
+def import_profile(upload_dir: str) -> list[tuple[str, int, int]]:
+    """Uma importação de app.main num processo novo: [(módulo, próprio µs, acumulado µs)]."""
+    env = {**os.environ, "UPLOAD_DIR": upload_dir}
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app.main"],
+        cwd=BACKEND, env=env, capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        raise SystemExit(f"falha ao importar app.main:\n{proc.stderr[-2000:]}")
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        own, cumulative, name = line[len("import time:"):].split("|")
+        rows.append((name.strip(), int(own), int(cumulative)))
+    return rows
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=1500, help="limite para a mediana de import app.main")
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+
+    totals, packages = [], Counter()
+    upload_dir = tempfile.mkdtemp(prefix="petid-bench-")
+    for _ in range(args.runs):
+        rows = import_profile(upload_dir)
+        totals.append(next(c for name, _, c in rows if name == "app.main") / 1000)
+        for name, own, _ in rows:
+            packages[name.split(".")[0]] += own / 1000 / args.runs
+
+    median = statistics.median(totals)
+    print(f"import app.main: mediana {median:.0f}ms (min {min(totals):.0f}ms, max {max(totals):.0f}ms, {args.runs} execuções)")
+    print("pacotes mais pesados (tempo próprio médio):")
+    for package, ms in packages.most_common(args.top):
+        print(f"  {package:24} {ms:8.1f}ms")
+
+    failures = []
+    eager = [m for m in LAZY_MODULES if m in packages]
+    if eager:
+        failures.append(f"importados no startup (deveriam ser sob demanda): {', '.join(eager)}")
+    if median > args.budget_ms:
+        failures.append(f"mediana {median:.0f}ms > orçamento {args.budget_ms:.0f}ms")
+    for failure in failures:
+        print(f"REGRESSÃO: {failure}")
+    raise SystemExit(1 if failures else 0)
+
+if __name__ == "__main__":
+    main()
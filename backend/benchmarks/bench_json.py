@@ -0,0 +1,91 @@
+"""Custo de serialização por item das listas de pets e do diário.
+
+Uso (a partir de backend/):
+    python -m benchmarks.bench_json --sizes 10,100,1000
+
+Compara, para listas já normalizadas (`normalize_pet`/`normalize_entry`):
+- "response_model": o caminho padrão do FastAPI (valida pelo response_model,
+  converte com jsonable/serialize e gera o corpo com JSONResponse);
+- "fast": `fast_json` de app.core.fastjson (orjson se instalado);
+- "fast+debug": o mesmo, validando contra o modelo como em DEBUG=true.
+"""
+import argparse
+import asyncio
+import time
+from datetime import datetime, timedelta
+
+from bson import ObjectId
+
+from benchmarks import _common  # noqa: F401 – variáveis de ambiente padrão
+
+def entry_doc(i: int, pet_id: ObjectId) -> dict:
+    return {
+        "_id": ObjectId(), "pet_id": pet_id, "date": datetime(2024, 1, 1) + timedelta(hours=i),
+        "appetite": "high", "energy": "mid", "symptom_photo": None, "medication": i % 3 == 0,
+        "notes": "Comeu bem e brincou no quintal" if i % 2 else None,
+    }
+
+def pet_doc(i: int, owner_id: ObjectId) -> dict:
+    return {
+        "_id": ObjectId(), "name": f"Pet {i}", "species": "cachorro", "breed": "SRD", "age": 3,
+        "birthdate": None, "weight": 12.5, "allergies": None, "photo": "/static/abc.jpg", "owner_id": owner_id,
+        "vaccines": [
+            {"id": str(v), "name": f"Vacina {v}", "description": "Polivalente", "ageRecommendation": "6 semanas",
+             "frequency": "anual", "priority": "essential", "applied": bool(v % 2)}
+            for v in range(6)
+        ],
+    }
+
+async def timed(fn, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        await fn()
+    return (time.perf_counter() - start) / repeat
+
+async def main_async(sizes: list[int], repeat: int):
+    from fastapi.responses import JSONResponse
+    from fastapi.routing import APIRoute, serialize_response
+    from app.core import fastjson
+    from app.main import app
+    from app.routes.diary import normalize_entry
+    from app.routes.pets import normalize_pet
+
+    routes = {r.name: r for r in app.routes if isinstance(r, APIRoute)}
+    cases = {
+        "list_pets": (routes["list_pets"], lambda n: [normalize_pet(pet_doc(i, ObjectId())) for i in range(n)]),
+        "get_entries": (routes["get_entries"], lambda n: [normalize_entry(entry_doc(i, ObjectId())) for i in range(n)]),
+    }
+    print(f"orjson: {'sim' if fastjson.orjson is not None else 'não (json da biblioteca padrão)'}")
+    print(f"{'rota':12} {'itens':>6} {'response_model':>16} {'fast':>10} {'fast+debug':>12}  (µs/item)")
+    for name, (route, build) in cases.items():
+        model = route.response_model
+        for n in sizes:
+            items = build(n)
+
+            async def default_path():
+                content = await serialize_response(field=route.response_field, response_content=items)
+                JSONResponse(content).body
+
+            async def fast():
+                fastjson.fast_json(items, model).body
+
+            async def fast_debug():
+                fastjson.settings.DEBUG = True
+                try:
+                    fastjson.fast_json(items, model).body
+                finally:
+                    fastjson.settings.DEBUG = False
+
+            reps = max(1, repeat // n)
+            costs = [await timed(fn, reps) / n * 1e6 for fn in (default_path, fast, fast_debug)]
+            print(f"{name:12} {n:>6} {costs[0]:>16.2f} {costs[1]:>10.2f} {costs[2]:>12.2f}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="10,100,1000")
+    parser.add_argument("--repeat", type=int, default=20000, help="itens serializados por medição")
+    args = parser.parse_args()
+    asyncio.run(main_async([int(s) for s in args.sizes.split(",")], args.repeat))
+
+if __name__ == "__main__":
+    main()
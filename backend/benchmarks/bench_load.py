@@ -0,0 +1,298 @@
+"""Teste de carga reproduzível da API inteira, sem rede nem serviços externos.
+
+Uso (a partir de backend/):
+    python -m benchmarks.bench_load --requests 2000 --concurrency 32
+    python -m benchmarks.bench_load --save-baseline      # grava a referência desta máquina
+    python -m benchmarks.bench_load --backend mongo      # MongoDB local em MONGO_URI
+
+Sobe `app.main:app` no próprio processo (com lifespan) contra um MongoDB em
+memória compatível com o Motor (pacote `mongomock-motor`, só para
+benchmarks) ou um mongod local, e um servidor OpenAI falso
+(benchmarks.fake_openai). Depois de semear usuários, pets e diários,
+dispara uma mistura ponderada de rotas (MIX, ajustável com --mix) com
+sorteio de semente fixa, e reporta vazão, p50/p95/p99 por cenário e memória
+alocada por requisição (tracemalloc, numa passada sequencial separada).
+
+Se existir um baseline (--baseline), compara: vazão total menor, p95 ou
+alocação maiores que a tolerância (--tolerance) fazem o script sair com 1.
+"""
+import argparse
+import asyncio
+import io
+import json
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+import uuid
+from pathlib import Path
+
+from benchmarks._common import percentile
+from benchmarks.fake_openai import FakeOpenAIServer
+
+BASELINE = Path(__file__).with_name("baseline.json")
+# cenário -> peso na mistura
+MIX = {
+    "login": 1,
+    "list_pets": 10,
+    "create_pet": 2,
+    "add_entry": 12,
+    "bulk_entries": 1,
+    "list_diary": 10,
+    "export_diary": 1,
+    "public_card": 15,
+    "report_pdf": 2,
+    "upload": 2,
+    "ai_chat": 1,
+}
+USERS = 8
+PETS_PER_USER = 2
+SEED_ENTRIES = 200
+PASSWORD = "senha-benchmark"
+
+def parse_mix(value: str) -> dict[str, int]:
+    mix = {}
+    for part in value.split(","):
+        name, _, weight = part.partition("=")
+        if name.strip() not in MIX:
+            raise SystemExit(f"cenário desconhecido: {name} (opções: {', '.join(MIX)})")
+        mix[name.strip()] = int(weight or 1)
+    return mix
+
+def entry(pet_id: str, rng: random.Random) -> dict:
+    return {
+        "pet_id": pet_id,
+        "date": f"2024-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}T{rng.randint(0, 23):02d}:00:00",
+        "appetite": rng.choice(["high", "mid", "low"]),
+        "energy": rng.choice(["high", "mid", "low"]),
+        "medication": rng.random() < 0.3,
+        "notes": rng.choice([None, "Comeu bem", "Vomitou uma vez", "Dormiu a tarde toda"]),
+    }
+
+def jpeg(rng: random.Random) -> bytes:
+    from PIL import Image
+    buffer = io.BytesIO()
+    Image.new("RGB", (320, 240), tuple(rng.randrange(256) for _ in range(3))).save(buffer, "JPEG")
+    return buffer.getvalue()
+
+class Scenarios:
+    """Cada cenário faz uma requisição com um usuário/pet sorteado e devolve a resposta."""
+
+    def __init__(self, client, users: list[dict], rng: random.Random):
+        self.client = client
+        self.users = users
+        self.rng = rng
+
+    def pick(self):
+        user = self.rng.choice(self.users)
+        return user, self.rng.choice(user["pets"])
+
+    async def login(self):
+        user, _ = self.pick()
+        return await self.client.post("/api/auth/login", data={"username": user["email"], "password": PASSWORD})
+
+    async def list_pets(self):
+        user, _ = self.pick()
+        return await self.client.get("/api/pets", headers=user["headers"])
+
+    async def create_pet(self):
+        user, _ = self.pick()
+        return await self.client.post("/api/pets", json={"name": "Novo", "species": "gato"}, headers=user["headers"])
+
+    async def add_entry(self):
+        user, pet_id = self.pick()
+        return await self.client.post("/api/diary", json=entry(pet_id, self.rng), headers=user["headers"])
+
+    async def bulk_entries(self):
+        user, pet_id = self.pick()
+        items = [entry(pet_id, self.rng) for _ in range(50)]
+        return await self.client.post("/api/diary/bulk", json=items, headers=user["headers"])
+
+    async def list_diary(self):
+        user, pet_id = self.pick()
+        return await self.client.get(f"/api/diary/{pet_id}?limit=50", headers=user["headers"])
+
+    async def export_diary(self):
+        user, pet_id = self.pick()
+        return await self.client.get(f"/api/diary/{pet_id}/export?format=csv", headers=user["headers"])
+
+    async def public_card(self):
+        _, pet_id = self.pick()
+        return await self.client.get(f"/public/pet/{pet_id}")
+
+    async def report_pdf(self):
+        user, pet_id = self.pick()
+        return await self.client.get(f"/api/reports/diary/{pet_id}", headers=user["headers"])
+
+    async def upload(self):
+        user, _ = self.pick()
+        files = {"file": ("foto.jpg", jpeg(self.rng), "image/jpeg")}
+        return await self.client.post("/api/upload", files=files, headers=user["headers"])
+
+    async def ai_chat(self):
+        return await self.client.post("/api/ai-chat", json={
+            "pet_name": "Rex", "pet_species": "cachorro", "messages": [], "new_message": "Ele está bem?",
+        })
+
+async def seed(client, rng: random.Random) -> list[dict]:
+    users = []
+    for i in range(USERS):
+        email = f"bench{i}-{uuid.uuid4().hex[:8]}@example.com"
+        await client.post("/api/auth/register", json={"email": email, "password": PASSWORD})
+        r = await client.post("/api/auth/login", data={"username": email, "password": PASSWORD})
+        r.raise_for_status()
+        headers = {"Authorization": f"Bearer {r.json()['access_token']}"}
+        pets = []
+        for j in range(PETS_PER_USER):
+            r = await client.post("/api/pets", json={"name": f"Pet {i}.{j}", "species": "cachorro"}, headers=headers)
+            r.raise_for_status()
+            pet_id = r.json()["id"]
+            items = [entry(pet_id, rng) for _ in range(SEED_ENTRIES)]
+            (await client.post("/api/diary/bulk", json=items, headers=headers)).raise_for_status()
+            pets.append(pet_id)
+        users.append({"email": email, "headers": headers, "pets": pets})
+    return users
+
+async def load(scenarios: Scenarios, mix: dict[str, int], requests: int, concurrency: int, rng: random.Random):
+    names = list(mix)
+    plan = rng.choices(names, weights=[mix[n] for n in names], k=requests)
+    samples: dict[str, list[float]] = {n: [] for n in names}
+    errors: dict[str, int] = {n: 0 for n in names}
+    queue = iter(plan)
+
+    async def worker():
+        for name in queue:
+            start = time.perf_counter()
+            try:
+                r = await getattr(scenarios, name)()
+                ok = r.status_code < 400
+            except Exception:
+                ok = False
+            samples[name].append(time.perf_counter() - start)
+            errors[name] += not ok
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return time.perf_counter() - started, samples, errors
+
+async def allocations(scenarios: Scenarios, names: list[str], repeat: int) -> dict[str, float]:
+    """Pico de memória alocada (KiB) por requisição, com uma requisição por vez."""
+    result = {}
+    tracemalloc.start()
+    try:
+        for name in names:
+            peaks = []
+            for _ in range(repeat):
+                tracemalloc.reset_peak()
+                base = tracemalloc.get_traced_memory()[0]
+                await getattr(scenarios, name)()
+                peaks.append((tracemalloc.get_traced_memory()[1] - base) / 1024)
+            result[name] = sorted(peaks)[len(peaks) // 2]
+    finally:
+        tracemalloc.stop()
+    return result
+
+async def run(args) -> dict:
+    import httpx
+    from app.core import db as db_module
+    from app.main import app
+
+    if args.backend == "memory":
+        try:
+            from mongomock_motor import AsyncMongoMockClient
+        except ImportError:
+            raise SystemExit("backend 'memory' requer o pacote mongomock-motor (pip install mongomock-motor)")
+        db_module._db = AsyncMongoMockClient()[os.environ["MONGO_DB"]]
+
+    rng = random.Random(args.seed)
+    transport = httpx.ASGITransport(app=app)
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(transport=transport, base_url="http://petid", timeout=120) as client:
+            users = await seed(client, rng)
+            scenarios = Scenarios(client, users, rng)
+            mix = parse_mix(args.mix) if args.mix else MIX
+            elapsed, samples, errors = await load(scenarios, mix, args.requests, args.concurrency, rng)
+            allocs = await allocations(scenarios, list(mix), args.alloc_repeat)
+        if args.backend == "mongo":
+            await db_module.get_client().drop_database(os.environ["MONGO_DB"])
+
+    results = {"total": {"requests": args.requests, "rps": args.requests / elapsed,
+                         "errors": sum(errors.values())}}
+    for name in mix:
+        ms = [s * 1000 for s in samples[name]]
+        results[name] = {
+            "n": len(ms), "errors": errors[name],
+            "p50": percentile(ms, 50), "p95": percentile(ms, 95), "p99": percentile(ms, 99),
+            "alloc_kib": allocs.get(name, 0.0),
+        }
+    return results
+
+def report(results: dict):
+    total = results["total"]
+    print(f"{total['requests']} requisições, {total['rps']:.1f} req/s, {total['errors']} erro(s)")
+    print(f"{'cenário':14} {'n':>6} {'erros':>6} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'KiB/req':>9}")
+    for name, r in results.items():
+        if name == "total":
+            continue
+        print(f"{name:14} {r['n']:>6} {r['errors']:>6} {r['p50']:>9.1f} {r['p95']:>9.1f} {r['p99']:>9.1f} {r['alloc_kib']:>9.1f}")
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list[str]:
+    regressions = []
+    if results["total"]["rps"] < baseline["total"]["rps"] * (1 - tolerance):
+        regressions.append(f"vazão: {results['total']['rps']:.1f} < {baseline['total']['rps']:.1f} req/s")
+    for name, r in results.items():
+        base = baseline.get(name)
+        if name == "total" or not base:
+            continue
+        for metric in ("p95", "alloc_kib"):
+            # pisos evitam falsos alarmes em valores muito pequenos
+            floor = 1.0 if metric == "p95" else 16.0
+            limit = max(base[metric], floor) * (1 + tolerance)
+            if r[metric] > limit:
+                regressions.append(f"{name} {metric}: {r[metric]:.1f} > {limit:.1f} (baseline {base[metric]:.1f})")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--mix", help="ex.: public_card=10,list_pets=5 (padrão: MIX)")
+    parser.add_argument("--backend", choices=["memory", "mongo"], default="memory")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--alloc-repeat", type=int, default=20)
+    parser.add_argument("--openai-latency", type=float, default=0.2)
+    parser.add_argument("--baseline", type=Path, default=BASELINE)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="variação aceita em relação ao baseline")
+    parser.add_argument("--json", type=Path, help="grava os resultados neste arquivo")
+    args = parser.parse_args()
+
+    tmp = tempfile.mkdtemp(prefix="petid-bench-")
+    os.environ.setdefault("MONGO_DB", f"petid_bench_{uuid.uuid4().hex[:8]}")
+    os.environ["UPLOAD_DIR"] = os.path.join(tmp, "uploads")
+    os.environ["REPORT_CACHE_DIR"] = os.path.join(tmp, "reports")
+    os.makedirs(os.environ["UPLOAD_DIR"])
+
+    with FakeOpenAIServer(latency=args.openai_latency) as fake:
+        os.environ["OPENAI_API_KEY"] = "sk-fake"
+        os.environ["OPENAI_BASE_URL"] = fake.base_url
+        results = asyncio.run(run(args))
+
+    report(results)
+    if args.json:
+        args.json.write_text(json.dumps(results, indent=2))
+    if args.save_baseline:
+        args.baseline.write_text(json.dumps(results, indent=2))
+        print(f"baseline gravado em {args.baseline}")
+        return
+    if not args.baseline.exists():
+        print(f"sem baseline em {args.baseline}; use --save-baseline para criar")
+        return
+    regressions = compare(results, json.loads(args.baseline.read_text()), args.tolerance)
+    for line in regressions:
+        print(f"REGRESSÃO {line}")
+    raise SystemExit(1 if regressions else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""Latência de login (bcrypt) e de requisições concorrentes, antes e depois do pool.
+
+Uso (a partir de backend/):
+    python -m benchmarks.bench_login --logins 64 --concurrency 16
+
+O modo "inline" reproduz o comportamento antigo (bcrypt direto no handler);
+o modo "pool" usa o `password_hasher` de `app.core.security`. Uma tarefa
+paralela simula as demais rotas (pets, diário, carteirinha pública) a cada
+`--probe-interval` segundos e mede quanto ela atrasa.
+"""
+import argparse
+import asyncio
+import time
+
+from benchmarks._common import summary
+
+from app.core.security import hash_password, verify_password, PasswordHasher
+
+async def probe(stop: asyncio.Event, interval: float, samples: list[float]):
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        samples.append(time.perf_counter() - start - interval)
+
+async def run(mode: str, hashed: str, logins: int, concurrency: int, hasher: PasswordHasher, interval: float):
+    login_samples: list[float] = []
+    probe_samples: list[float] = []
+    sem = asyncio.Semaphore(concurrency)
+
+    async def login():
+        async with sem:
+            start = time.perf_counter()
+            if mode == "inline":
+                verify_password("senha-correta", hashed)
+            else:
+                await hasher.verify("senha-correta", hashed)
+            login_samples.append(time.perf_counter() - start)
+
+    stop = asyncio.Event()
+    probe_task = asyncio.create_task(probe(stop, interval, probe_samples))
+    started = time.perf_counter()
+    await asyncio.gather(*(login() for _ in range(logins)))
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await probe_task
+
+    print(f"[{mode}] {logins} logins em {elapsed:.2f}s ({logins / elapsed:.1f}/s)")
+    print(f"  login:        {summary(login_samples)}")
+    print(f"  outras rotas: {summary(probe_samples)}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--logins", type=int, default=64)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--executor", choices=["thread", "process"], default="thread")
+    parser.add_argument("--probe-interval", type=float, default=0.005)
+    args = parser.parse_args()
+
+    hashed = hash_password("senha-correta")
+    hasher = PasswordHasher(workers=args.workers, max_pending=args.logins, executor=args.executor)
+    try:
+        for mode in ("inline", "pool"):
+            asyncio.run(run(mode, hashed, args.logins, args.concurrency, hasher, args.probe_interval))
+    finally:
+        hasher.shutdown()
+
+if __name__ == "__main__":
+    main()
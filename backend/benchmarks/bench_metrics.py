@@ -0,0 +1,68 @@
+"""Custo do middleware de métricas por requisição.
+
+Uso (a partir de backend/):
+    python -m benchmarks.bench_metrics --requests 20000
+
+Chama a aplicação direto pela interface ASGI (sem servidor nem cliente HTTP,
+para o ruído não esconder a diferença) em GET /api, com e sem
+`MetricsMiddleware`, e mede também o tempo para gerar o texto de /metrics.
+"""
+import argparse
+import asyncio
+import os
+import time
+
+from benchmarks._common import summary
+
+os.environ["METRICS_ENABLED"] = "false"  # o benchmark aplica o middleware por fora
+
+def make_scope(path: str) -> dict:
+    return {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+        "scheme": "http", "path": path, "raw_path": path.encode(), "root_path": "", "query_string": b"",
+        "headers": [(b"host", b"petid")], "client": ("127.0.0.1", 1234), "server": ("petid", 80),
+    }
+
+async def call(app, path: str):
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        pass
+
+    await app(make_scope(path), receive, send)
+
+async def run(label: str, app, requests: int) -> float:
+    for _ in range(200):  # aquecimento
+        await call(app, "/api")
+    samples = []
+    started = time.perf_counter()
+    for _ in range(requests):
+        start = time.perf_counter()
+        await call(app, "/api")
+        samples.append(time.perf_counter() - start)
+    elapsed = time.perf_counter() - started
+    mean_us = elapsed / requests * 1e6
+    print(f"[{label:14}] {requests / elapsed:,.0f} req/s, {mean_us:.1f}µs/req  {summary(samples)}")
+    return mean_us
+
+async def main_async(requests: int):
+    from app.core import metrics
+    from app.main import app
+
+    plain = await run("sem métricas", app, requests)
+    measured = await run("com métricas", metrics.MetricsMiddleware(app), requests)
+    print(f"custo do middleware: {measured - plain:+.1f}µs/req ({(measured / plain - 1) * 100:+.1f}%)")
+
+    start = time.perf_counter()
+    text = metrics.render()
+    print(f"render de /metrics: {(time.perf_counter() - start) * 1000:.2f}ms, {len(text)} bytes")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=20000)
+    args = parser.parse_args()
+    asyncio.run(main_async(args.requests))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""Servidor HTTP local que imita /v1/chat/completions da OpenAI.
+
+Responde depois de `latency` segundos, sem consumir CPU, para medir o efeito
+de chamadas lentas ao LLM sobre o restante da API. Com `"stream": true` envia
+a resposta em chunks SSE no formato da OpenAI. Uso isolado:
+    python -m benchmarks.fake_openai --port 8765 --latency 2
+"""
+import argparse
+import asyncio
+import json
+import socket
+import threading
+import time
+
+import uvicorn
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, StreamingResponse
+from starlette.routing import Route
+
+FAKE_REPLY = (
+    '[{"name": "V10", "description": "Polivalente", "ageRecommendation": "6 semanas", '
+    '"frequency": "anual", "priority": "essential"}]'
+)
+
+def build_app(latency: float, stream_chunks: int = 20) -> Starlette:
+    async def stream_reply(model: str):
+        # O primeiro token demora `latency`/4 e o restante chega aos poucos
+        await asyncio.sleep(latency / 4)
+        step = max(1, len(FAKE_REPLY) // stream_chunks)
+        for i in range(0, len(FAKE_REPLY), step):
+            chunk = {
+                "id": "chatcmpl-fake",
+                "object": "chat.completion.chunk",
+                "created": int(time.time()),
+                "model": model,
+                "choices": [{"index": 0, "delta": {"content": FAKE_REPLY[i:i+step]}, "finish_reason": None}],
+            }
+            yield f"data: {json.dumps(chunk)}\n\n"
+            await asyncio.sleep(latency * 3 / 4 / stream_chunks)
+        yield "data: [DONE]\n\n"
+
+    async def chat_completions(request: Request):
+        body = await request.json()
+        if body.get("stream"):
+            return StreamingResponse(stream_reply(body.get("model", "gpt-4o-mini")), media_type="text/event-stream")
+        await asyncio.sleep(latency)
+        return JSONResponse({
+            "id": "chatcmpl-fake",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "gpt-4o-mini"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": FAKE_REPLY},
+                "finish_reason": "stop",
+            }],
+            "usage": {"prompt_tokens": 10, "completion_tokens": 10, "total_tokens": 20},
+        })
+
+    return Starlette(routes=[Route("/v1/chat/completions", chat_completions, methods=["POST"])])
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+class FakeOpenAIServer:
+    """Sobe o servidor falso em uma thread própria (com seu próprio event loop)."""
+
+    def __init__(self, latency: float = 1.0, port: int | None = None):
+        self.port = port or free_port()
+        config = uvicorn.Config(build_app(latency), host="127.0.0.1", port=self.port, log_level="warning")
+        self.server = uvicorn.Server(config)
+        self.thread = threading.Thread(target=self.server.run, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.port}/v1"
+
+    def __enter__(self):
+        self.thread.start()
+        while not self.server.started:
+            time.sleep(0.01)
+        return self
+
+    def __exit__(self, *exc):
+        self.server.should_exit = True
+        self.thread.join(timeout=5)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=1.0)
+    args = parser.parse_args()
+    uvicorn.run(build_app(args.latency), host="127.0.0.1", port=args.port)
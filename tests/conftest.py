@@ -0,0 +1,11 @@
+import os
+import sys
+import tempfile
+
+BACKEND = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "backend")
+sys.path.insert(0, BACKEND)
+
+# app.* monta o Settings na importação; sem MongoDB real, os testes usam mongomock-motor
+os.environ.setdefault("MONGO_URI", "mongodb://localhost:27017/")
+os.environ.setdefault("JWT_SECRET", "test-secret-test-secret-test-secret")
+os.environ.setdefault("UPLOAD_DIR", tempfile.mkdtemp(prefix="petid-test-uploads-"))
@@ -0,0 +1,39 @@
+import pytest
+
+from app.routes.ai import AGE_BUCKETS, age_bucket, age_in_months
+
+FILHOTE, JOVEM, ADULTO, IDOSO = AGE_BUCKETS
+
+@pytest.mark.parametrize("age, months", [
+    ("3 anos e 2 meses", 38),
+    ("1 ano e 6 meses", 18),
+    ("2", 24),
+    ("4,5 meses", 4.5),
+    ("2 years", 24),
+    ("Três meses", None),
+    ("", None),
+])
+def test_age_in_months(age, months):
+    if months is None:
+        assert age_in_months(age) is None
+    else:
+        assert age_in_months(age) == pytest.approx(months)
+
+@pytest.mark.parametrize("age, bucket", [
+    ("3 anos e 2 meses", ADULTO),
+    ("1 ano e 6 meses", ADULTO),
+    ("10 semanas", FILHOTE),
+    ("45 dias", FILHOTE),
+    ("4 meses", FILHOTE),
+    ("5 meses", JOVEM),
+    ("12 meses", JOVEM),
+    ("1 ano", JOVEM),
+    ("13 meses", ADULTO),
+    ("7 anos e 11 meses", ADULTO),
+    ("8 anos", IDOSO),
+    ("12", IDOSO),
+    ("filhote", FILHOTE),
+    ("idade desconhecida", None),
+])
+def test_age_bucket(age, bucket):
+    assert age_bucket(age) == bucket
@@ -0,0 +1,60 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from bson import ObjectId
+
+from app.core import pet_stats
+from app.core.db import stored_datetime
+
+mongomock_motor = pytest.importorskip("mongomock_motor")
+
+def entry(date, appetite="high", energy="mid", **extra):
+    return {"_id": ObjectId(), "date": date, "appetite": appetite, "energy": energy, **extra}
+
+def test_stored_datetime_converts_aware_dates_to_naive_utc():
+    aware = datetime(2024, 1, 1, 22, 30, 0, 123456, tzinfo=timezone(timedelta(hours=-3)))
+    assert stored_datetime(aware) == datetime(2024, 1, 2, 1, 30, 0, 123000)
+    assert stored_datetime(datetime(2024, 1, 1, 10, 0, 0, 999999)) == datetime(2024, 1, 1, 10, 0, 0, 999000)
+
+@pytest.mark.parametrize("date", [
+    datetime(2024, 1, 1, 22, 30, tzinfo=timezone.utc),
+    datetime(2024, 1, 1, 19, 30, tzinfo=timezone(timedelta(hours=-3))),
+])
+def test_accumulate_mixes_aware_and_naive_dates(date):
+    stats = pet_stats.accumulate({}, entry(datetime(2024, 1, 1, 10, 0)))
+    pet_stats.accumulate(stats, entry(date))
+    assert stats["first_date"] == datetime(2024, 1, 1, 10, 0)
+    assert stats["last_date"] == datetime(2024, 1, 1, 22, 30)
+    assert stats["days"]["2024-01-01"]["count"] == 2
+
+def test_record_entries_backfills_pet_with_old_entries_and_aware_dates():
+    async def scenario():
+        db = mongomock_motor.AsyncMongoMockClient()["petid_test"]
+        pet = ObjectId()
+        old = [{**entry(datetime(2024, 1, 1) + timedelta(hours=i)), "pet_id": pet} for i in range(150)]
+        await db.diary.insert_many(old)
+
+        # "-03:00" às 22:30 cai no dia seguinte em UTC, como o diário guarda
+        new = [
+            {**entry(datetime(2024, 2, 1, 22, 30, tzinfo=timezone(timedelta(hours=-3)))), "pet_id": pet},
+            {**entry(datetime(2024, 2, 3, 8, 0, tzinfo=timezone.utc)), "pet_id": pet},
+        ]
+        for e in new:  # como add_entry: grava no diário e depois atualiza o resumo
+            await db.diary.insert_one({**e, "date": stored_datetime(e["date"])})
+            await pet_stats.record_entries([e], db)
+
+        stats = await db.pet_stats.find_one({"_id": pet})
+        assert stats["count"] == 152
+        assert stats["first_date"] == datetime(2024, 1, 1)
+        assert stats["last_date"] == datetime(2024, 2, 3, 8, 0)
+        assert stats["days"]["2024-02-02"]["count"] == 1
+        assert "2024-02-01" not in stats["days"]
+
+        # o recálculo completo chega no mesmo resumo
+        assert await pet_stats.rebuild(pet, db)
+        rebuilt = await db.pet_stats.find_one({"_id": pet})
+        for field in ("count", "score_sum", "first_date", "last_date", "days"):
+            assert rebuilt[field] == stats[field]
+
+    asyncio.run(scenario())